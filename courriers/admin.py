@@ -3,7 +3,8 @@ from django.conf.urls import url
 from django import forms
 from django.shortcuts import get_object_or_404
 from django.utils.translation import ugettext as _
-from django.http import HttpResponseRedirect
+from django.http import HttpResponseRedirect, JsonResponse
+from django.template.response import TemplateResponse
 from django.urls import reverse
 
 from .models import Newsletter, NewsletterItem, NewsletterList, NewsletterSegment
@@ -59,24 +60,47 @@ class NewsletterAdmin(admin.ModelAdmin):
         my_urls = [
             url(
                 r"^send/(?P<newsletter_id>(\d+))/$",
-                self.send_newsletter,
+                self.admin_site.admin_view(self.send_newsletter),
                 name="send_newsletter",
-            )
+            ),
+            url(
+                r"^send/(?P<newsletter_id>(\d+))/progress/$",
+                self.admin_site.admin_view(self.send_newsletter_progress),
+                name="send_newsletter_progress",
+            ),
         ]
         return my_urls + urls
 
     def send_newsletter(self, request, newsletter_id):
-        from courriers.backends import get_backend
-
-        backend_klass = get_backend()
-        backend = backend_klass()
+        from courriers.tasks import send_newsletter
 
         newsletter = get_object_or_404(Newsletter, pk=newsletter_id)
-        backend.send_mails(newsletter)
+        send_newsletter.delay(newsletter.pk)
 
-        self.message_user(request, _('The newsletter "%s" has been sent.') % newsletter)
+        self.message_user(request, _('The newsletter "%s" is being sent.') % newsletter)
         return HttpResponseRedirect(
-            reverse("admin:courriers_newsletter_change", args=(newsletter.id,))
+            reverse("admin:send_newsletter_progress", args=(newsletter.id,))
+        )
+
+    def send_newsletter_progress(self, request, newsletter_id):
+        from courriers.progress import SendProgress
+
+        newsletter = get_object_or_404(Newsletter, pk=newsletter_id)
+        progress = SendProgress(newsletter.pk).get()
+
+        if request.GET.get("format") == "json":
+            return JsonResponse({"progress": progress})
+
+        context = dict(
+            self.admin_site.each_context(request),
+            opts=self.model._meta,
+            original=newsletter,
+            progress=progress,
+            title=_('Sending "%s"') % newsletter,
+        )
+
+        return TemplateResponse(
+            request, "admin/courriers/newsletter/send_progress.html", context
         )
 
     def newsletter_list_link(self, obj):
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class CourriersConfig(AppConfig):
+    name = "courriers"
+    verbose_name = "Courriers"
+
+    def ready(self):
+        from .caching import connect_signals
+
+        connect_signals()
@@ -1,7 +1,44 @@
+import threading
+
+_classes = {}
+_instances = {}
+_lock = threading.Lock()
+
+
 def get_backend():
     from ..settings import BACKEND_CLASS
     from ..utils import load_class
 
-    backend = load_class(BACKEND_CLASS)
+    try:
+        return _classes[BACKEND_CLASS]
+    except KeyError:
+        with _lock:
+            if BACKEND_CLASS not in _classes:
+                _classes[BACKEND_CLASS] = load_class(BACKEND_CLASS)
+
+            return _classes[BACKEND_CLASS]
+
+
+def get_backend_instance():
+    """
+    Returns the backend instance shared by the whole process, it is created
+    on first use.
+    """
+    from ..settings import BACKEND_CLASS
+
+    try:
+        return _instances[BACKEND_CLASS]
+    except KeyError:
+        backend_klass = get_backend()
+
+        with _lock:
+            if BACKEND_CLASS not in _instances:
+                _instances[BACKEND_CLASS] = backend_klass()
+
+            return _instances[BACKEND_CLASS]
+
 
-    return backend
+def reset_backends():
+    with _lock:
+        _classes.clear()
+        _instances.clear()
@@ -1,12 +1,24 @@
 class BaseBackend(object):
+    shardable = False
+
     def register(self, email, lang=None, user=None):
         raise NotImplemented
 
     def unregister(self, email, user=None):
         raise NotImplemented
 
+    def unsubscribe_all(self, email, list_ids):
+        for list_id in list_ids:
+            self.unsubscribe(list_id=list_id, email=email)
+
     def exists(self, email, user=None):
         raise NotImplemented
 
     def send_mails(self, newsletter):
         raise NotImplemented
+
+    def get_subscribers(self, newsletter):
+        raise NotImplementedError
+
+    def iter_list_contacts(self, list_id):
+        raise NotImplementedError
@@ -12,6 +12,8 @@ logger = logging.getLogger("courriers")
 
 
 class CampaignBackend(SimpleBackend):
+    shardable = False
+
     def send_mails(self, newsletter):
         if not newsletter.is_online():
             raise Exception("This newsletter is not online. You can't send it.")
@@ -48,8 +50,8 @@ class CampaignBackend(SimpleBackend):
         else:
             newsletter.sent = True
             newsletter.save(update_fields=("sent",))
-
-        translation.activate(old_language)
+        finally:
+            translation.activate(old_language)
 
     def subscribe(self, email, list_id):
         pass
@@ -0,0 +1,227 @@
+import logging
+import queue
+import threading
+
+from collections import namedtuple
+
+from django.core import mail
+
+logger = logging.getLogger("courriers")
+
+
+class DeliveryResult(namedtuple("DeliveryResult", ["tag", "statuses", "error"])):
+    """
+    ``statuses`` tells whether each message of the chunk was sent, messages
+    left after an error have no status.
+    """
+
+    @property
+    def sent(self):
+        return sum(self.statuses)
+
+
+class Delivery(object):
+    def __init__(self, fail_silently=False, throttle=None):
+        self.fail_silently = fail_silently
+        self.throttle = throttle
+
+    def send_messages(self, connection, messages, tag=None):
+        statuses = []
+
+        try:
+            for message in messages:
+                if self.throttle is not None:
+                    self.throttle.acquire()
+
+                # One message per call, the connection only reports how many
+                # messages it sent
+                statuses.append(bool(connection.send_messages([message])))
+        except Exception as e:
+            logger.exception(e)
+
+            return DeliveryResult(tag, statuses, e)
+
+        return DeliveryResult(tag, statuses, None)
+
+    def send(self, messages, tag=None):
+        raise NotImplementedError
+
+    def abort(self):
+        pass
+
+    def close(self):
+        return []
+
+
+class ConnectionDelivery(Delivery):
+    """
+    Sends every chunk through a single connection opened for the whole send.
+    """
+
+    def __init__(self, fail_silently=False, throttle=None):
+        super(ConnectionDelivery, self).__init__(
+            fail_silently=fail_silently, throttle=throttle
+        )
+
+        self.connection = mail.get_connection(fail_silently=fail_silently)
+        self.connection.open()
+
+    def send(self, messages, tag=None):
+        return [self.send_messages(self.connection, messages, tag=tag)]
+
+    def close(self):
+        self.connection.close()
+
+        return []
+
+
+class PooledDelivery(Delivery):
+    """
+    Spreads chunks over ``pool_size`` connections, each driven by its own
+    worker thread. Chunks go through a bounded queue so rendering blocks
+    when every connection is busy.
+    """
+
+    def __init__(self, pool_size, queue_size=None, fail_silently=False, throttle=None):
+        super(PooledDelivery, self).__init__(
+            fail_silently=fail_silently, throttle=throttle
+        )
+
+        self.pool_size = pool_size
+
+        self._queue = queue.Queue(maxsize=queue_size or pool_size * 2)
+        self._results = queue.Queue()
+        self._aborted = threading.Event()
+        self._errors = []
+        self._workers = [
+            threading.Thread(target=self._work, name="courriers-delivery-%d" % i)
+            for i in range(pool_size)
+        ]
+
+        for worker in self._workers:
+            worker.daemon = True
+            worker.start()
+
+    def _work(self):
+        try:
+            self._serve()
+        except Exception as e:
+            logger.exception(e)
+
+            self._errors.append(e)
+
+    def _serve(self):
+        connection, error = None, None
+
+        try:
+            connection = mail.get_connection(fail_silently=self.fail_silently)
+        except Exception as e:
+            logger.exception(e)
+
+            error = e
+        else:
+            try:
+                connection.open()
+            except Exception as e:
+                logger.exception(e)
+
+        try:
+            while True:
+                item = self._queue.get()
+
+                if item is None:
+                    break
+
+                messages, tag = item
+
+                if self._aborted.is_set():
+                    continue
+
+                if connection is None:
+                    # Without a connection every chunk of the worker fails
+                    self._results.put(DeliveryResult(tag, [], error))
+                else:
+                    self._results.put(self.send_messages(connection, messages, tag=tag))
+        finally:
+            if connection is not None:
+                try:
+                    connection.close()
+                except Exception as e:
+                    logger.exception(e)
+
+    def _is_alive(self):
+        return [worker.is_alive() for worker in self._workers]
+
+    def _check_workers(self, running=True):
+        """
+        Raises when a worker died, or exited while ``running`` is expected.
+        """
+        if self._errors:
+            raise RuntimeError("A delivery worker died: %s" % self._errors[0])
+
+        if running and not all(self._is_alive()):
+            raise RuntimeError("A delivery worker died")
+
+    def _put(self, item):
+        # A dead worker would leave the producer blocked on a full queue
+        while True:
+            self._check_workers()
+
+            try:
+                self._queue.put(item, timeout=0.1)
+            except queue.Full:
+                continue
+
+            return
+
+    def _drain(self):
+        results = []
+
+        while True:
+            try:
+                results.append(self._results.get_nowait())
+            except queue.Empty:
+                break
+
+        return results
+
+    def send(self, messages, tag=None):
+        self._put((messages, tag))
+
+        return self._drain()
+
+    def abort(self):
+        self._aborted.set()
+
+    def close(self):
+        for worker in self._workers:
+            while any(self._is_alive()):
+                try:
+                    self._queue.put(None, timeout=0.1)
+                except queue.Full:
+                    continue
+
+                break
+
+        for worker in self._workers:
+            worker.join()
+
+        results = self._drain()
+
+        # After an abort the error which caused it is raised instead
+        if not self._aborted.is_set():
+            self._check_workers(running=False)
+
+        return results
+
+
+def get_delivery(pool_size=0, queue_size=None, fail_silently=False, throttle=None):
+    if pool_size and pool_size > 1:
+        return PooledDelivery(
+            pool_size,
+            queue_size=queue_size,
+            fail_silently=fail_silently,
+            throttle=throttle,
+        )
+
+    return ConnectionDelivery(fail_silently=fail_silently, throttle=throttle)
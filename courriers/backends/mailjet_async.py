@@ -0,0 +1,281 @@
+from __future__ import absolute_import, unicode_literals
+
+import asyncio
+import logging
+import random
+
+from urllib.parse import quote
+
+import httpx
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import translation
+
+from ..models import NewsletterListOperation
+from ..settings import (
+    DEFAULT_FROM_EMAIL,
+    DEFAULT_FROM_NAME,
+    FAIL_SILENTLY,
+    MAILJET_API_KEY,
+    MAILJET_API_SECRET_KEY,
+    MAILJET_API_URL,
+    MAILJET_BACKOFF_FACTOR,
+    MAILJET_BATCH_SUBSCRIPTIONS,
+    MAILJET_CONTACTSLIST_LIMIT,
+    MAILJET_MAX_RETRIES,
+    MAILJET_POOL_SIZE,
+    MAILJET_TIMEOUT,
+)
+from ..utils import chunked
+from .mailjet_utils import (
+    get_campaign_options,
+    iter_campaign_steps,
+    record_campaign_step,
+    render_campaign,
+)
+
+logger = logging.getLogger("courriers")
+
+RETRY_STATUSES = (502, 503, 504)
+
+RETRY_METHODS = ("GET", "PUT", "DELETE")
+
+
+class AsyncMailjetRESTBackend(object):
+    """
+    Asynchronous counterpart of ``MailjetRESTBackend``: every provider call
+    is a coroutine sharing one HTTP client, so many of them can be awaited
+    concurrently on a single event loop, at most ``MAILJET_POOL_SIZE`` at a
+    time.
+
+    The client is bound to the running event loop, use the backend as an
+    async context manager or await ``aclose()`` when done.
+    """
+
+    def __init__(self, client=None):
+        if not MAILJET_API_KEY:
+            raise ImproperlyConfigured(
+                "Please specify your MAILJET API key in Django settings"
+            )
+
+        if not MAILJET_API_SECRET_KEY:
+            raise ImproperlyConfigured(
+                "Please specify your MAILJET API SECRET key in Django settings"
+            )
+
+        self._client = client
+        self._semaphore = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url="%sv3/REST/" % MAILJET_API_URL,
+                auth=(MAILJET_API_KEY, MAILJET_API_SECRET_KEY),
+                timeout=MAILJET_TIMEOUT,
+                transport=httpx.AsyncHTTPTransport(
+                    retries=MAILJET_MAX_RETRIES,
+                    limits=httpx.Limits(
+                        max_connections=MAILJET_POOL_SIZE,
+                        max_keepalive_connections=MAILJET_POOL_SIZE,
+                    ),
+                ),
+            )
+
+        return self._client
+
+    @property
+    def semaphore(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(MAILJET_POOL_SIZE)
+
+        return self._semaphore
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+
+            self._client = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.aclose()
+
+    def is_retry(self, method, status_code):
+        """
+        Rate limited calls are always retried but gateway errors only for
+        idempotent methods, Mailjet may have handled the call before.
+        """
+        if status_code == 429:
+            return True
+
+        return method.upper() in RETRY_METHODS and status_code in RETRY_STATUSES
+
+    async def request(self, method, path, **kwargs):
+        attempt = 0
+
+        while True:
+            async with self.semaphore:
+                response = await self.client.request(method, path, **kwargs)
+
+            if not self.is_retry(method, response.status_code) or (
+                attempt >= MAILJET_MAX_RETRIES
+            ):
+                break
+
+            backoff = MAILJET_BACKOFF_FACTOR * (2**attempt)
+
+            attempt += 1
+
+            if backoff > 0:
+                await asyncio.sleep(random.uniform(0, backoff))
+
+        response.raise_for_status()
+
+        return response.json()
+
+    def _get_campaign(self, newsletter):
+        nl_list = newsletter.newsletter_list
+        nl_segment = newsletter.newsletter_segment
+
+        options = get_campaign_options(
+            newsletter, nl_list.list_id, segment_id=nl_segment.segment_id
+        )
+
+        with translation.override(nl_segment.lang or settings.LANGUAGE_CODE):
+            data = render_campaign(newsletter, options)
+
+        return options, data
+
+    async def _send_campaign(self, newsletter):
+        options, data = await sync_to_async(self._get_campaign)(newsletter)
+
+        for step, action, campaign_id, content in iter_campaign_steps(
+            newsletter, options, lambda: data
+        ):
+            if action is None:
+                path = "campaigndraft"
+            else:
+                path = "campaigndraft/%s/%s" % (campaign_id, action)
+
+            result = await self.request("POST", path, json=content)
+
+            await sync_to_async(record_campaign_step)(newsletter, step, result)
+
+    async def send_campaign(self, newsletter):
+        if not newsletter.is_online():
+            raise Exception("This newsletter is not online. You can't send it.")
+
+        if not DEFAULT_FROM_EMAIL:
+            raise ImproperlyConfigured(
+                "You have to specify a DEFAULT_FROM_EMAIL in Django settings."
+            )
+        if not DEFAULT_FROM_NAME:
+            raise ImproperlyConfigured(
+                "You have to specify a DEFAULT_FROM_NAME in Django settings."
+            )
+
+        try:
+            await self._send_campaign(newsletter)
+        except Exception as e:
+            logger.exception(e)
+
+            if not FAIL_SILENTLY:
+                raise e
+        else:
+            newsletter.sent = True
+
+            await sync_to_async(newsletter.save)(update_fields=("sent",))
+
+    async def send_campaigns(self, newsletters):
+        return await asyncio.gather(
+            *[self.send_campaign(newsletter) for newsletter in newsletters],
+            return_exceptions=True
+        )
+
+    async def _manage_many_contacts(self, list_id, action, emails):
+        await asyncio.gather(
+            *[
+                self.request(
+                    "POST",
+                    "contactslist/%s/managemanycontacts" % list_id,
+                    json={
+                        "Action": action,
+                        "Contacts": [{"Email": email} for email in batch],
+                    },
+                )
+                for batch in chunked(emails, MAILJET_CONTACTSLIST_LIMIT)
+            ]
+        )
+
+    async def _enqueue_operation(self, list_id, email, action):
+        await sync_to_async(NewsletterListOperation.objects.create)(
+            list_id=list_id, email=email, action=action
+        )
+
+    async def subscribe(self, list_id, email, lang=None, user=None):
+        if MAILJET_BATCH_SUBSCRIPTIONS:
+            await self._enqueue_operation(
+                list_id, email, NewsletterListOperation.ACTION_SUBSCRIBE
+            )
+        else:
+            await self.subscribe_many(list_id, [email])
+
+    async def unsubscribe(self, list_id, email, lang=None, user=None):
+        if MAILJET_BATCH_SUBSCRIPTIONS:
+            await self._enqueue_operation(
+                list_id, email, NewsletterListOperation.ACTION_UNSUBSCRIBE
+            )
+        else:
+            await self.unsubscribe_many(list_id, [email])
+
+    async def unsubscribe_all(self, email, list_ids):
+        list_ids = [list_id for list_id in list_ids if list_id is not None]
+
+        if not list_ids:
+            return
+
+        if MAILJET_BATCH_SUBSCRIPTIONS:
+            for list_id in list_ids:
+                await self._enqueue_operation(
+                    list_id, email, NewsletterListOperation.ACTION_UNSUBSCRIBE
+                )
+
+            return
+
+        data = {
+            "ContactsLists": [
+                {"ListID": list_id, "Action": "unsub"} for list_id in list_ids
+            ]
+        }
+
+        try:
+            await self.request(
+                "POST", "contact/%s/managecontactslists" % quote(email), json=data
+            )
+        except httpx.HTTPStatusError as e:
+            # Mailjet does not know the contact, it is not on any list
+            if e.response.status_code != 404:
+                raise
+
+    async def subscribe_many(self, list_id, emails):
+        await self._manage_many_contacts(list_id, "addforce", emails)
+
+    async def unsubscribe_many(self, list_id, emails):
+        await self._manage_many_contacts(list_id, "unsub", emails)
+
+    async def sync_lists(self, subscriptions):
+        """
+        Uploads ``{list_id: emails}`` to every list concurrently.
+        """
+        await asyncio.gather(
+            *[
+                self.subscribe_many(list_id, emails)
+                for list_id, emails in subscriptions.items()
+            ]
+        )
@@ -1,19 +1,111 @@
 from __future__ import absolute_import, unicode_literals
 
-from mailjet_rest import Client
+import csv
+import io
+import random
+import threading
+
+from mailjet_rest import Client, DoesNotExistError
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from django.core.exceptions import ImproperlyConfigured
-from django.template.loader import render_to_string
 
 from ..settings import (
     MAILJET_API_KEY,
-    DEFAULT_FROM_EMAIL,
-    DEFAULT_FROM_NAME,
     MAILJET_API_SECRET_KEY,
-    PRE_PROCESSORS,
+    MAILJET_API_URL,
+    MAILJET_BACKOFF_FACTOR,
+    MAILJET_BATCH_SUBSCRIPTIONS,
+    MAILJET_CONTACTFILTER_LIMIT,
+    MAILJET_CONTACTSLIST_LIMIT,
+    MAILJET_MAX_RETRIES,
+    MAILJET_POOL_SIZE,
+    MAILJET_TIMEOUT,
 )
 from .campaign import CampaignBackend
-from ..utils import load_class
+from .mailjet_utils import (
+    get_campaign_options,
+    iter_campaign_steps,
+    record_campaign_step,
+    render_campaign,
+)
+from ..models import NewsletterListOperation
+from ..utils import array_contains, chunked, sorted_array
+
+
+class JitterRetry(Retry):
+    """
+    Retries idempotent calls on every status of ``status_forcelist`` but
+    other calls (campaign drafts, sends...) only when they were rate limited,
+    a gateway error may come after Mailjet handled the call.
+    """
+
+    def is_retry(self, method, status_code, has_retry_after=False):
+        if status_code == 429:
+            return True
+
+        return super(JitterRetry, self).is_retry(
+            method, status_code, has_retry_after=has_retry_after
+        )
+
+    def get_backoff_time(self):
+        backoff = super(JitterRetry, self).get_backoff_time()
+
+        return random.uniform(0, backoff) if backoff > 0 else 0
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_adapter():
+    return HTTPAdapter(
+        pool_connections=MAILJET_POOL_SIZE,
+        pool_maxsize=MAILJET_POOL_SIZE,
+        max_retries=JitterRetry(
+            total=MAILJET_MAX_RETRIES,
+            backoff_factor=MAILJET_BACKOFF_FACTOR,
+            status_forcelist=(429, 502, 503, 504),
+            raise_on_status=False,
+        ),
+    )
+
+
+def get_client():
+    """
+    Returns the Mailjet client shared by the whole process, its HTTP session
+    keeps connections alive and retries rate limited and unavailable calls.
+    """
+    global _client
+
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                client = Client(
+                    auth=(MAILJET_API_KEY, MAILJET_API_SECRET_KEY),
+                    api_url=MAILJET_API_URL,
+                    timeout=MAILJET_TIMEOUT,
+                )
+
+                adapter = get_adapter()
+
+                client.session.mount("https://", adapter)
+                client.session.mount("http://", adapter)
+
+                _client = client
+
+    return _client
+
+
+def reset_client():
+    global _client
+
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+
+        _client = None
 
 
 class MailjetRESTBackend(CampaignBackend):
@@ -28,53 +120,143 @@ class MailjetRESTBackend(CampaignBackend):
                 "Please specify your MAILJET API SECRET key in Django settings"
             )
 
-        self.client = Client(auth=(MAILJET_API_KEY, MAILJET_API_SECRET_KEY))
+        self.client = get_client()
 
     def _send_campaign(self, newsletter, list_id, segment_id=None):
-        subject = newsletter.name
-
-        options = {
-            "Subject": subject,
-            "ContactsListID": list_id,
-            "Locale": "en",
-            "SenderEmail": DEFAULT_FROM_EMAIL,
-            "Sender": DEFAULT_FROM_NAME,
-            "SenderName": DEFAULT_FROM_NAME,
-            "Title": subject,
-        }
+        options = get_campaign_options(newsletter, list_id, segment_id=segment_id)
+
+        steps = iter_campaign_steps(
+            newsletter, options, lambda: render_campaign(newsletter, options)
+        )
 
-        if segment_id:
-            options["SegmentationID"] = segment_id
+        for step, action, campaign_id, data in steps:
+            if action is None:
+                endpoint = self.client.campaigndraft
+            else:
+                endpoint = getattr(self.client, "campaigndraft_%s" % action)
 
-        context = {
-            "object": newsletter,
-            "items": newsletter.items.select_related("newsletter"),
-            "options": options,
+            res = endpoint.create(id=campaign_id, data=data)
+            res.raise_for_status()
+
+            record_campaign_step(newsletter, step, res.json())
+
+    def _manage_many_contacts(self, list_id, action, emails):
+        for batch in chunked(emails, MAILJET_CONTACTSLIST_LIMIT):
+            data = {
+                "Action": action,
+                "Contacts": [{"Email": email} for email in batch],
+            }
+
+            res = self.client.contactslist_ManageManyContacts.create(
+                id=list_id, data=data
+            )
+            res.raise_for_status()
+
+    def subscribe(self, list_id, email, lang=None, user=None):
+        if MAILJET_BATCH_SUBSCRIPTIONS:
+            self.enqueue_operation(
+                list_id, email, NewsletterListOperation.ACTION_SUBSCRIBE
+            )
+        else:
+            self.subscribe_many(list_id, [email])
+
+    def unsubscribe(self, list_id, email, lang=None, user=None):
+        if MAILJET_BATCH_SUBSCRIPTIONS:
+            self.enqueue_operation(
+                list_id, email, NewsletterListOperation.ACTION_UNSUBSCRIBE
+            )
+        else:
+            self.unsubscribe_many(list_id, [email])
+
+    def unsubscribe_all(self, email, list_ids):
+        list_ids = [list_id for list_id in list_ids if list_id is not None]
+
+        if not list_ids:
+            return
+
+        if MAILJET_BATCH_SUBSCRIPTIONS:
+            for list_id in list_ids:
+                self.enqueue_operation(
+                    list_id, email, NewsletterListOperation.ACTION_UNSUBSCRIBE
+                )
+
+            return
+
+        data = {
+            "ContactsLists": [
+                {"ListID": list_id, "Action": "unsub"} for list_id in list_ids
+            ]
         }
 
-        html = render_to_string("courriers/newsletter_raw_detail.html", context)
-        text = render_to_string("courriers/newsletter_raw_detail.txt", context)
+        try:
+            res = self.client.contact_managecontactslists.create(id=email, data=data)
+        except DoesNotExistError:
+            # Mailjet does not know the contact, it is not on any list
+            return
 
-        for pre_processor in PRE_PROCESSORS:
-            html = load_class(pre_processor)(html)
+        res.raise_for_status()
 
-        res = self.client.campaigndraft.create(data=options)
+    def import_contacts(self, list_id, emails):
+        """
+        Uploads the emails as a CSV file and starts a Mailjet import job,
+        returns the job ID.
+        """
+        data = io.StringIO()
 
-        result = res.json()
+        writer = csv.writer(data, lineterminator="\n")
+        writer.writerow(["email"])
+        writer.writerows([email] for email in emails)
 
-        campaign_id = result["Data"][0]["ID"]
+        res = self.client.contactslist_csvdata.create(id=list_id, data=data.getvalue())
+        res.raise_for_status()
 
-        data = {"Html-part": html, "Text-part": text}
+        res = self.client.csvimport.create(
+            data={
+                "ContactsListID": list_id,
+                "DataID": res.json()["ID"],
+                "Method": "addforce",
+            }
+        )
+        res.raise_for_status()
 
-        self.client.campaigndraft_detailcontent.create(id=campaign_id, data=data)
-        self.client.campaigndraft_send.create(id=campaign_id)
+        return res.json()["Data"][0]["ID"]
 
-    def subscribe(self, list_id, email, lang=None, user=None):
-        data = {"Action": "addforce", "Contacts": [{"Email": email}]}
+    def _iter_pages(self, resource, filters):
+        offset = 0
 
-        self.client.contactslist_ManageManyContacts.create(id=list_id, data=data)
+        while True:
+            res = resource.get(
+                filters=dict(filters, Limit=MAILJET_CONTACTFILTER_LIMIT, Offset=offset)
+            )
+            res.raise_for_status()
 
-    def unsubscribe(self, list_id, email, lang=None, user=None):
-        data = {"Action": "unsub", "Contacts": [{"Email": email}]}
+            rows = res.json()["Data"]
+
+            for row in rows:
+                yield row
+
+            if len(rows) < MAILJET_CONTACTFILTER_LIMIT:
+                break
+
+            offset += len(rows)
+
+    def iter_list_contacts(self, list_id):
+        """
+        Yields ``(email, is_unsubscribed)`` for every contact of the list,
+        paging ``MAILJET_CONTACTFILTER_LIMIT`` contacts at a time.
+        """
+        unsubscribed = sorted_array(
+            row["ContactID"]
+            for row in self._iter_pages(
+                self.client.listrecipient, {"ContactsList": list_id, "Unsub": True}
+            )
+        )
+
+        for contact in self._iter_pages(self.client.contact, {"ContactsList": list_id}):
+            yield contact["Email"], array_contains(unsubscribed, contact["ID"])
+
+    def subscribe_many(self, list_id, emails):
+        self._manage_many_contacts(list_id, "addforce", emails)
 
-        self.client.contactslist_ManageManyContacts.create(id=list_id, data=data)
+    def unsubscribe_many(self, list_id, emails):
+        self._manage_many_contacts(list_id, "unsub", emails)
@@ -0,0 +1,71 @@
+from django.template.loader import render_to_string
+
+from ..processors import get_pre_processor
+from ..settings import DEFAULT_FROM_EMAIL, DEFAULT_FROM_NAME
+
+
+def get_campaign_options(newsletter, list_id, segment_id=None):
+    subject = newsletter.name
+
+    options = {
+        "Subject": subject,
+        "ContactsListID": list_id,
+        "Locale": "en",
+        "SenderEmail": DEFAULT_FROM_EMAIL,
+        "Sender": DEFAULT_FROM_NAME,
+        "SenderName": DEFAULT_FROM_NAME,
+        "Title": subject,
+    }
+
+    if segment_id:
+        options["SegmentationID"] = segment_id
+
+    return options
+
+
+def render_campaign(newsletter, options):
+    items = newsletter.items.select_related("newsletter").prefetch_content_objects()
+
+    context = {
+        "object": newsletter,
+        "items": items,
+        "options": options,
+    }
+
+    html = render_to_string("courriers/newsletter_raw_detail.html", context)
+    text = render_to_string("courriers/newsletter_raw_detail.txt", context)
+
+    return {"Html-part": get_pre_processor()(html), "Text-part": text}
+
+
+def iter_campaign_steps(newsletter, options, get_content):
+    """
+    Yields ``(step, action, campaign_id, data)`` for every call left to send
+    the campaign of the newsletter, ``action`` is the campaign draft action
+    to call or ``None`` to create the draft.
+
+    The caller records each step with ``record_campaign_step()`` once its
+    call succeeded, an interrupted send resumes after the last recorded one.
+    """
+    if not newsletter.reached_campaign_step(newsletter.CAMPAIGN_STEP_DRAFT):
+        yield newsletter.CAMPAIGN_STEP_DRAFT, None, None, options
+
+    if not newsletter.reached_campaign_step(newsletter.CAMPAIGN_STEP_CONTENT):
+        yield (
+            newsletter.CAMPAIGN_STEP_CONTENT,
+            "detailcontent",
+            newsletter.campaign_id,
+            get_content(),
+        )
+
+    if not newsletter.reached_campaign_step(newsletter.CAMPAIGN_STEP_SENT):
+        yield newsletter.CAMPAIGN_STEP_SENT, "send", newsletter.campaign_id, None
+
+
+def record_campaign_step(newsletter, step, result):
+    campaign_id = None
+
+    if step == newsletter.CAMPAIGN_STEP_DRAFT:
+        campaign_id = result["Data"][0]["ID"]
+
+    newsletter.set_campaign_step(step, campaign_id=campaign_id)
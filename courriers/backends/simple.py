@@ -1,25 +1,92 @@
 # -*- coding: utf-8 -*-
+import logging
+
+from itertools import groupby
+from operator import attrgetter
+
 from .base import BaseBackend
+from .delivery import get_delivery
 
-from django.core import mail
+from django.core.exceptions import ImproperlyConfigured
 from django.core.mail import EmailMultiAlternatives
-from django.template.loader import render_to_string
 from django.utils import translation
 from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count
+from django.db.models.query import QuerySet
 
-from ..settings import DEFAULT_FROM_EMAIL, PRE_PROCESSORS
-from ..utils import load_class
+from ..models import NewsletterDelivery, NewsletterListOperation
+from ..processors import get_pre_processor
+from ..rendering import NewsletterRenderer
+from ..settings import (
+    DEFAULT_FROM_EMAIL,
+    DELIVERY_LEDGER,
+    DELIVERY_POOL_SIZE,
+    DELIVERY_QUEUE_SIZE,
+    NEWSLETTERSUBSCRIBER_MODEL,
+    SEND_CHUNK_SIZE,
+)
+from ..throttling import get_throttle
+from ..utils import chunked, load_class
 
 User = get_user_model()
 
+logger = logging.getLogger("courriers")
+
 
 class SimpleBackend(BaseBackend):
+    shardable = True
+
     def subscribe(self, list_id, email, lang=None, user=None):
         pass
 
     def unsubscribe(self, list_id, email, lang=None, user=None):
         pass
 
+    def subscribe_many(self, list_id, emails):
+        for email in emails:
+            self.subscribe(list_id, email)
+
+    def unsubscribe_many(self, list_id, emails):
+        for email in emails:
+            self.unsubscribe(list_id, email)
+
+    def import_contacts(self, list_id, emails):
+        self.subscribe_many(list_id, emails)
+
+    def enqueue_operation(self, list_id, email, action):
+        NewsletterListOperation.objects.create(
+            list_id=list_id, email=email, action=action
+        )
+
+    def flush_operations(self, limit=None):
+        """
+        Applies the queued list operations, keeping only the last action of
+        each email and grouping the others in as few calls as possible.
+        """
+        with transaction.atomic():
+            operations = NewsletterListOperation.objects.select_for_update(
+                skip_locked=True
+            ).order_by("pk")
+
+            if limit:
+                operations = operations[:limit]
+
+            operations = list(operations)
+
+            batches = NewsletterListOperation.objects.coalesce(operations)
+
+            for (list_id, action), emails in batches.items():
+                if action == NewsletterListOperation.ACTION_SUBSCRIBE:
+                    self.subscribe_many(list_id, emails)
+                else:
+                    self.unsubscribe_many(list_id, emails)
+
+            for pks in chunked((operation.pk for operation in operations), 1000):
+                NewsletterListOperation.objects.filter(pk__in=pks).delete()
+
+        return len(operations)
+
     def register(self, email, newsletter_list, lang=None, user=None):
         if not user:
             try:
@@ -38,54 +105,231 @@ class SimpleBackend(BaseBackend):
 
         user.unsubscribe(newsletter_list, lang=lang)
 
-    def send_mails(self, newsletter, fail_silently=False, subscribers=None):
-        connection = mail.get_connection(fail_silently=fail_silently)
+    def get_delivery(self, fail_silently=False, pool_size=None):
+        return get_delivery(
+            pool_size=DELIVERY_POOL_SIZE if pool_size is None else pool_size,
+            queue_size=DELIVERY_QUEUE_SIZE,
+            fail_silently=fail_silently,
+            throttle=get_throttle(),
+        )
 
-        emails = []
+    def get_list_subscribers(self, newsletter_list):
+        if not NEWSLETTERSUBSCRIBER_MODEL:
+            raise ImproperlyConfigured(
+                "You have to specify COURRIERS_NEWSLETTERSUBSCRIBER_MODEL "
+                "in Django settings to send newsletters without subscribers."
+            )
 
-        old_language = translation.get_language()
+        model = load_class(
+            NEWSLETTERSUBSCRIBER_MODEL, "COURRIERS_NEWSLETTERSUBSCRIBER_MODEL"
+        )
 
-        for subscriber in subscribers:
-            if (
-                newsletter.newsletter_segment.lang
-                and newsletter.newsletter_segment.lang != subscriber.lang
-            ):
-                continue
+        return model.objects.filter(
+            newsletter_list=newsletter_list, is_unsubscribed=False
+        )
+
+    def get_subscribers(self, newsletter):
+        return self.filter_subscribers(
+            newsletter, self.get_list_subscribers(newsletter.newsletter_list_id)
+        )
+
+    def filter_subscribers(self, newsletter, subscribers):
+        lang = newsletter.newsletter_segment.lang
+
+        if lang:
+            subscribers = subscribers.filter(lang=lang)
+
+        return subscribers.only("email", "lang").order_by("lang", "pk")
+
+    def get_send_plan(self, newsletter, subscribers=None):
+        if subscribers is None:
+            subscribers = self.get_subscribers(newsletter)
+
+        return dict(
+            subscribers.order_by("lang")
+            .values_list("lang")
+            .annotate(count=Count("pk"))
+            .values_list("lang", "count")
+        )
+
+    def send_mails(
+        self,
+        newsletter,
+        fail_silently=False,
+        subscribers=None,
+        chunk_size=None,
+        pool_size=None,
+        progress=None,
+    ):
+        results = self.deliver(
+            newsletter,
+            fail_silently=fail_silently,
+            subscribers=subscribers,
+            chunk_size=chunk_size,
+            pool_size=pool_size,
+            progress=progress,
+        )
+
+        newsletter.sent = True
+        newsletter.save(update_fields=("sent",))
+
+        return results
 
-            translation.activate(subscriber.lang)
+    def deliver(
+        self,
+        newsletter,
+        fail_silently=False,
+        subscribers=None,
+        chunk_size=None,
+        pool_size=None,
+        progress=None,
+    ):
+        if subscribers is None:
+            subscribers = self.get_subscribers(newsletter)
+        elif isinstance(subscribers, QuerySet):
+            subscribers = self.filter_subscribers(newsletter, subscribers)
 
-            email = EmailMultiAlternatives(
-                newsletter.name,
-                render_to_string(
-                    "courriers/newsletter_raw_detail.txt",
-                    {"object": newsletter, "subscriber": subscriber},
+        if DELIVERY_LEDGER:
+            subscribers = self.exclude_delivered(newsletter, subscribers)
+
+        if isinstance(subscribers, QuerySet):
+            logger.info(
+                "Sending newsletter %s to %s",
+                newsletter.pk,
+                ", ".join(
+                    "%d subscribers in %s" % (count, lang or "default language")
+                    for lang, count in self.get_send_plan(
+                        newsletter, subscribers
+                    ).items()
                 ),
-                DEFAULT_FROM_EMAIL,
-                [subscriber.email],
-                connection=connection,
             )
 
-            html = render_to_string(
-                "courriers/newsletter_raw_detail.html",
-                {
-                    "object": newsletter,
-                    "items": newsletter.items.all().prefetch_related("newsletter"),
-                    "subscriber": subscriber,
-                },
+        chunk_size = chunk_size or SEND_CHUNK_SIZE
+
+        delivery = self.get_delivery(fail_silently=fail_silently, pool_size=pool_size)
+
+        old_language = translation.get_language()
+
+        sent = 0
+
+        try:
+            emails = self._iter_emails(newsletter, subscribers, chunk_size)
+
+            for chunk in chunked(emails, chunk_size):
+                results = delivery.send(
+                    [email for subscriber, email in chunk],
+                    tag=[
+                        (subscriber.pk, subscriber.email) for subscriber, email in chunk
+                    ],
+                )
+
+                sent += self._process_results(newsletter, delivery, results, progress)
+        except Exception:
+            delivery.abort()
+
+            self._process_results(
+                newsletter, delivery, delivery.close(), progress, raise_errors=False
             )
 
-            for pre_processor in PRE_PROCESSORS:
-                html = load_class(pre_processor)(html)
+            raise
+        else:
+            sent += self._process_results(
+                newsletter, delivery, delivery.close(), progress
+            )
+        finally:
+            translation.activate(old_language)
 
-            email.attach_alternative(html, "text/html")
+        return sent
 
-            emails.append(email)
+    def exclude_delivered(self, newsletter, subscribers):
+        delivered = NewsletterDelivery.objects.sent(newsletter).values_list(
+            "email", flat=True
+        )
 
-        translation.activate(old_language)
+        if isinstance(subscribers, QuerySet):
+            return subscribers.exclude(email__in=delivered)
 
-        results = connection.send_messages(emails)
+        delivered = set(delivered)
 
-        newsletter.sent = True
-        newsletter.save(update_fields=("sent",))
+        return (
+            subscriber
+            for subscriber in subscribers
+            if subscriber.email not in delivered
+        )
 
-        return results
+    def _process_results(
+        self, newsletter, delivery, results, progress=None, raise_errors=True
+    ):
+        for result in results:
+            if DELIVERY_LEDGER:
+                sent = [
+                    recipient
+                    for recipient, status in zip(result.tag, result.statuses)
+                    if status
+                ]
+                failed = [
+                    recipient
+                    for index, recipient in enumerate(result.tag)
+                    if index >= len(result.statuses) or not result.statuses[index]
+                ]
+
+                NewsletterDelivery.objects.record(
+                    newsletter, sent, NewsletterDelivery.STATUS_SENT
+                )
+                NewsletterDelivery.objects.record(
+                    newsletter, failed, NewsletterDelivery.STATUS_FAILED
+                )
+
+            if progress is not None:
+                progress.update(
+                    processed=len(result.tag), errors=len(result.tag) - result.sent
+                )
+
+        if raise_errors and not delivery.fail_silently:
+            for result in results:
+                if result.error is not None:
+                    raise result.error
+
+        return sum(result.sent for result in results)
+
+    def _iter_subscribers(self, subscribers, chunk_size):
+        if isinstance(subscribers, QuerySet):
+            return subscribers.iterator(chunk_size=chunk_size)
+
+        return iter(subscribers)
+
+    def _iter_emails(self, newsletter, subscribers, chunk_size):
+        renderer = NewsletterRenderer(newsletter, pre_processor=get_pre_processor())
+
+        lang = newsletter.newsletter_segment.lang
+
+        partitions = groupby(
+            self._iter_subscribers(subscribers, chunk_size),
+            key=attrgetter("lang"),
+        )
+
+        for subscriber_lang, partition in partitions:
+            if lang and lang != subscriber_lang:
+                continue
+
+            translation.activate(subscriber_lang)
+
+            for subscriber in partition:
+                yield subscriber, self._build_email(renderer, subscriber)
+
+    def _build_email(self, renderer, subscriber):
+        email = EmailMultiAlternatives(
+            renderer.newsletter.name,
+            renderer.render("courriers/newsletter_raw_detail.txt", subscriber),
+            DEFAULT_FROM_EMAIL,
+            [subscriber.email],
+        )
+
+        email.attach_alternative(
+            renderer.render(
+                "courriers/newsletter_raw_detail.html", subscriber, html=True
+            ),
+            "text/html",
+        )
+
+        return email
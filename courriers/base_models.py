@@ -1,13 +1,17 @@
 import os
 
-from django.db import models
+from collections import OrderedDict, defaultdict
+
+from django.db import connections, models
+from django.db.models import F, Subquery, Window
+from django.db.models.functions import Lag, Lead
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.template.defaultfilters import slugify, truncatechars
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone as datetime
 from django.urls import reverse
-from django.db.models.query import QuerySet
+from django.db.models.query import ModelIterable, QuerySet
 
 from courriers.settings import ALLOWED_LANGUAGES
 
@@ -71,10 +75,79 @@ class NewsletterQuerySet(QuerySet):
         return (
             self.status_online()
             .filter(published_at__gt=current_date)
-            .order_by("-published_at")
+            .order_by("published_at")
             .first()
         )
 
+    def with_neighbours(self):
+        """
+        Annotates ``previous_id`` and ``next_id`` with the newsletters
+        published around each newsletter of its list.
+
+        The window only sees the rows of the queryset, so a page of the
+        archive gets its neighbours from ``status_online()`` on the whole
+        list before being sliced.
+        """
+        window = {
+            "partition_by": [F("newsletter_list")],
+            "order_by": [F("published_at").asc(), F("pk").asc()],
+        }
+
+        return self.annotate(
+            previous_id=Window(expression=Lag("pk"), **window),
+            next_id=Window(expression=Lead("pk"), **window),
+        )
+
+    def get_with_neighbours(self, pk):
+        """
+        Returns the online newsletter ``pk`` with its ``previous_object`` and
+        ``next_object`` fetched in the same query.
+        """
+        pk = self.model._meta.pk.to_python(pk)
+
+        queryset = (
+            self.status_online()
+            .filter(
+                newsletter_list=Subquery(
+                    self.model.objects.filter(pk=pk).values("newsletter_list")[:1]
+                )
+            )
+            .with_neighbours()
+            .order_by()
+        )
+
+        sql, params = queryset.query.sql_with_params()
+
+        quote_name = connections[self.db].ops.quote_name
+
+        # Window functions are evaluated after the WHERE clause, the
+        # newsletter and its neighbours are selected around them.
+        rows = {
+            obj.pk: obj
+            for obj in self.model.objects.db_manager(self.db).raw(
+                "SELECT * FROM (%s) neighbours WHERE %s = %%s OR %s = %%s OR %s = %%s"
+                % (
+                    sql,
+                    quote_name(self.model._meta.pk.column),
+                    quote_name("previous_id"),
+                    quote_name("next_id"),
+                ),
+                tuple(params) + (pk, pk, pk),
+            )
+        }
+
+        try:
+            obj = rows[pk]
+        except KeyError:
+            raise self.model.DoesNotExist(
+                "%s matching query does not exist." % self.model._meta.object_name
+            )
+
+        obj.previous_object = rows.get(obj.previous_id)
+        obj.next_object = rows.get(obj.next_id)
+
+        return obj
+
 
 class NewsletterManager(models.Manager):
     def get_queryset(self):
@@ -89,6 +162,12 @@ class NewsletterManager(models.Manager):
     def get_next(self, current_date):
         return self.get_queryset().get_next(current_date)
 
+    def with_neighbours(self):
+        return self.get_queryset().with_neighbours()
+
+    def get_with_neighbours(self, pk):
+        return self.get_queryset().get_with_neighbours(pk)
+
 
 class Newsletter(models.Model):
     STATUS_ONLINE = 1
@@ -96,6 +175,16 @@ class Newsletter(models.Model):
 
     STATUS_CHOICES = ((STATUS_ONLINE, _("Online")), (STATUS_DRAFT, _("Draft")))
 
+    CAMPAIGN_STEP_DRAFT = 1
+    CAMPAIGN_STEP_CONTENT = 2
+    CAMPAIGN_STEP_SENT = 3
+
+    CAMPAIGN_STEP_CHOICES = (
+        (CAMPAIGN_STEP_DRAFT, _("Draft created")),
+        (CAMPAIGN_STEP_CONTENT, _("Content uploaded")),
+        (CAMPAIGN_STEP_SENT, _("Sent")),
+    )
+
     name = models.CharField(max_length=255)
     published_at = models.DateTimeField(null=True)
     status = models.PositiveIntegerField(
@@ -111,6 +200,10 @@ class Newsletter(models.Model):
         "courriers.NewsletterSegment", related_name="segments", on_delete=models.PROTECT
     )
     sent = models.BooleanField(default=False, db_index=True)
+    campaign_id = models.IntegerField(blank=True, null=True)
+    campaign_step = models.PositiveIntegerField(
+        choices=CAMPAIGN_STEP_CHOICES, blank=True, null=True
+    )
 
     objects = NewsletterManager()
 
@@ -121,11 +214,17 @@ class Newsletter(models.Model):
         return self.name or ""
 
     def get_previous(self):
+        if hasattr(self, "previous_object"):
+            return self.previous_object
+
         return self.__class__.objects.filter(
             newsletter_list=self.newsletter_list_id
         ).get_previous(self.published_at)
 
     def get_next(self):
+        if hasattr(self, "next_object"):
+            return self.next_object
+
         return self.__class__.objects.filter(
             newsletter_list=self.newsletter_list_id
         ).get_next(self.published_at)
@@ -133,10 +232,100 @@ class Newsletter(models.Model):
     def is_online(self):
         return self.status == self.STATUS_ONLINE
 
+    def reached_campaign_step(self, step):
+        return self.campaign_step is not None and self.campaign_step >= step
+
+    def set_campaign_step(self, step, campaign_id=None):
+        if campaign_id is not None:
+            self.campaign_id = campaign_id
+
+        self.campaign_step = step
+        self.save(update_fields=("campaign_id", "campaign_step"))
+
     def get_absolute_url(self):
         return reverse("newsletter_detail", args=[self.pk])
 
 
+def prefetch_content_objects(items):
+    """
+    Sets the ``content_object`` of the items with one ``in_bulk`` query per
+    content type. ``COURRIERS_CONTENT_OBJECTS_SELECT_RELATED`` maps a model
+    label to the relations to select along its objects.
+    """
+    from courriers.settings import CONTENT_OBJECTS_SELECT_RELATED
+
+    object_ids = defaultdict(set)
+
+    for item in items:
+        if item.content_type_id is not None and item.object_id is not None:
+            object_ids[item.content_type_id].add(item.object_id)
+
+    objects = {}
+
+    for content_type_id, ids in object_ids.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+
+        if model is None:
+            continue
+
+        queryset = model._base_manager.all()
+
+        related = CONTENT_OBJECTS_SELECT_RELATED.get(model._meta.label_lower)
+
+        if related:
+            queryset = queryset.select_related(*related)
+
+        for pk, obj in queryset.in_bulk(list(ids)).items():
+            objects[(content_type_id, pk)] = obj
+
+    for item in items:
+        obj = objects.get((item.content_type_id, item.object_id))
+
+        if obj is not None:
+            item._meta.get_field("content_object").set_cached_value(item, obj)
+
+    return items
+
+
+class NewsletterItemQuerySet(QuerySet):
+    def __init__(self, *args, **kwargs):
+        super(NewsletterItemQuerySet, self).__init__(*args, **kwargs)
+
+        self._prefetch_content_objects = False
+
+    def _clone(self):
+        clone = super(NewsletterItemQuerySet, self)._clone()
+        clone._prefetch_content_objects = self._prefetch_content_objects
+
+        return clone
+
+    def _fetch_all(self):
+        fetched = self._result_cache is not None
+
+        super(NewsletterItemQuerySet, self)._fetch_all()
+
+        if (
+            not fetched
+            and self._prefetch_content_objects
+            and issubclass(self._iterable_class, ModelIterable)
+        ):
+            prefetch_content_objects(self._result_cache)
+
+    def prefetch_content_objects(self):
+        clone = self._chain()
+        clone._prefetch_content_objects = True
+
+        return clone
+
+
+class NewsletterItemManager(models.Manager):
+    def get_queryset(self):
+        return NewsletterItemQuerySet(self.model, using=self._db)
+
+    def prefetch_content_objects(self):
+        return self.get_queryset().prefetch_content_objects()
+
+
 class NewsletterItem(models.Model):
     newsletter = models.ForeignKey(
         "courriers.Newsletter", related_name="items", on_delete=models.CASCADE
@@ -152,9 +341,132 @@ class NewsletterItem(models.Model):
     url = models.URLField(blank=True, null=True)
     position = models.PositiveIntegerField(null=True, blank=True)
 
+    objects = NewsletterItemManager()
+
     class Meta:
         ordering = ["position"]
         abstract = True
 
     def __str__(self):
         return self.name or ""
+
+
+class NewsletterDeliveryManager(models.Manager):
+    def record(self, newsletter, subscribers, status):
+        """
+        Records the status of the ``(subscriber_id, email)`` recipients,
+        deliveries are keyed by email so recipients coming from any model
+        share the same ledger.
+        """
+        subscribers = {email: subscriber_id for subscriber_id, email in subscribers}
+
+        if not subscribers:
+            return
+
+        now = datetime.now()
+
+        # Shards running at the same time may record the same email, the rows
+        # inserted by another one are then updated like the existing ones
+        self.bulk_create(
+            [
+                self.model(
+                    newsletter=newsletter,
+                    subscriber_id=subscriber_id,
+                    email=email,
+                    status=status,
+                    updated_at=now,
+                )
+                for email, subscriber_id in subscribers.items()
+            ],
+            ignore_conflicts=True,
+        )
+
+        deliveries = list(
+            self.filter(newsletter=newsletter, email__in=list(subscribers)).exclude(
+                updated_at=now
+            )
+        )
+
+        for delivery in deliveries:
+            delivery.subscriber_id = subscribers[delivery.email]
+            delivery.status = status
+            delivery.attempt += 1
+            delivery.updated_at = now
+
+        if deliveries:
+            self.bulk_update(
+                deliveries, ("subscriber_id", "status", "attempt", "updated_at")
+            )
+
+    def sent(self, newsletter):
+        return self.filter(newsletter=newsletter, status=self.model.STATUS_SENT)
+
+
+class NewsletterDelivery(models.Model):
+    STATUS_SENT = 1
+    STATUS_FAILED = 2
+
+    STATUS_CHOICES = ((STATUS_SENT, _("Sent")), (STATUS_FAILED, _("Failed")))
+
+    newsletter = models.ForeignKey(
+        "courriers.Newsletter", related_name="deliveries", on_delete=models.CASCADE
+    )
+    subscriber_id = models.PositiveIntegerField()
+    email = models.EmailField(max_length=250)
+    status = models.PositiveIntegerField(choices=STATUS_CHOICES, db_index=True)
+    attempt = models.PositiveIntegerField(default=1)
+    updated_at = models.DateTimeField(default=datetime.now)
+
+    objects = NewsletterDeliveryManager()
+
+    class Meta:
+        abstract = True
+        unique_together = (("newsletter", "email"),)
+
+    def __str__(self):
+        return "%s for %s" % (self.email, self.newsletter)
+
+
+class NewsletterListOperationManager(models.Manager):
+    def coalesce(self, operations):
+        """
+        Keeps the last action of each (list_id, email) pair and groups the
+        emails by (list_id, action).
+        """
+        actions = OrderedDict()
+
+        for operation in operations:
+            key = (operation.list_id, operation.email)
+
+            actions.pop(key, None)
+            actions[key] = operation.action
+
+        batches = OrderedDict()
+
+        for (list_id, email), action in actions.items():
+            batches.setdefault((list_id, action), []).append(email)
+
+        return batches
+
+
+class NewsletterListOperation(models.Model):
+    ACTION_SUBSCRIBE = 1
+    ACTION_UNSUBSCRIBE = 2
+
+    ACTION_CHOICES = (
+        (ACTION_SUBSCRIBE, _("Subscribe")),
+        (ACTION_UNSUBSCRIBE, _("Unsubscribe")),
+    )
+
+    list_id = models.IntegerField()
+    email = models.EmailField(max_length=250)
+    action = models.PositiveIntegerField(choices=ACTION_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = NewsletterListOperationManager()
+
+    class Meta:
+        abstract = True
+
+    def __str__(self):
+        return "%s %s on %s" % (self.get_action_display(), self.email, self.list_id)
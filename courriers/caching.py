@@ -0,0 +1,240 @@
+import math
+import time
+
+from django.core.cache import caches
+from django.core.paginator import Page, Paginator
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils import timezone as datetime
+
+
+def get_cache():
+    from .settings import CACHE_ALIAS
+
+    return caches[CACHE_ALIAS]
+
+
+def is_enabled():
+    from .settings import PAGE_CACHE_TIMEOUT
+
+    return bool(PAGE_CACHE_TIMEOUT)
+
+
+def make_key(*parts):
+    return "courriers:views:%s" % ":".join(str(part) for part in parts)
+
+
+def get_version(name):
+    """
+    Returns the current version of ``name``, every cached page built from it
+    embeds this version in its key.
+    """
+    cache = get_cache()
+
+    key = make_key(name, "version")
+
+    version = cache.get(key)
+
+    if version is None:
+        # Start from the current time so pages cached before the version was
+        # evicted are never served again.
+        cache.add(key, int(time.time() * 1000), None)
+
+        version = cache.get(key)
+
+    return version
+
+
+def bump_version(name):
+    cache = get_cache()
+
+    key = make_key(name, "version")
+
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, int(time.time() * 1000), None)
+
+
+def get_timeout(newsletter_list_id):
+    """
+    Caps the cache timeout to the next scheduled newsletter of the list so it
+    shows up as soon as it is published.
+    """
+    from .models import Newsletter
+    from .settings import PAGE_CACHE_TIMEOUT
+
+    now = datetime.now()
+
+    published_at = (
+        Newsletter.objects.filter(
+            newsletter_list=newsletter_list_id,
+            status=Newsletter.STATUS_ONLINE,
+            published_at__gte=now,
+        )
+        .order_by("published_at")
+        .values_list("published_at", flat=True)
+        .first()
+    )
+
+    if published_at is None:
+        return PAGE_CACHE_TIMEOUT
+
+    return max(
+        1, min(PAGE_CACHE_TIMEOUT, math.ceil((published_at - now).total_seconds()))
+    )
+
+
+def get_or_set(key, callback, timeout):
+    cache = get_cache()
+
+    value = cache.get(key)
+
+    if value is None:
+        value = callback()
+
+        cache.set(key, value, timeout() if callable(timeout) else timeout)
+
+    return value
+
+
+def get_list_version(newsletter_list_id):
+    return get_version("list:%s" % newsletter_list_id)
+
+
+def get_newsletter_list(slug, callback):
+    from .settings import PAGE_CACHE_TIMEOUT
+
+    return get_or_set(
+        make_key("newsletter_list", slug, get_version("lists")),
+        callback,
+        PAGE_CACHE_TIMEOUT,
+    )
+
+
+def get_newsletter_list_id(newsletter_id):
+    from .models import Newsletter
+    from .settings import PAGE_CACHE_TIMEOUT
+
+    cache = get_cache()
+
+    key = make_key("newsletter", newsletter_id, "list")
+
+    newsletter_list_id = cache.get(key)
+
+    if newsletter_list_id is None:
+        newsletter_list_id = (
+            Newsletter.objects.filter(pk=newsletter_id)
+            .values_list("newsletter_list", flat=True)
+            .first()
+        )
+
+        if newsletter_list_id is not None:
+            cache.set(key, newsletter_list_id, PAGE_CACHE_TIMEOUT)
+
+    return newsletter_list_id
+
+
+def make_page_key(newsletter_list_id, key):
+    return make_key(
+        "page", newsletter_list_id, get_list_version(newsletter_list_id), *key
+    )
+
+
+def get_page(newsletter_list_id, key, callback):
+    """
+    Caches the objects of a page and the count of its paginator, ``callback``
+    returns the ``(paginator, page)`` to cache.
+    """
+
+    def paginate():
+        paginator, page = callback()
+
+        return list(page.object_list), paginator.count, paginator.per_page, page.number
+
+    object_list, count, per_page, number = get_or_set(
+        make_page_key(newsletter_list_id, key),
+        paginate,
+        lambda: get_timeout(newsletter_list_id),
+    )
+
+    paginator = Paginator([], per_page)
+    paginator.count = count
+
+    return paginator, Page(object_list, number, paginator)
+
+
+def get_keyset_page(newsletter_list_id, key, callback):
+    """
+    Caches the ``KeysetPage`` returned by ``callback``, it holds no
+    reference to its queryset.
+    """
+    return get_or_set(
+        make_page_key(newsletter_list_id, ("keyset",) + tuple(key)),
+        callback,
+        lambda: get_timeout(newsletter_list_id),
+    )
+
+
+def invalidate_newsletter_list(newsletter_list_id):
+    if newsletter_list_id is not None:
+        bump_version("list:%s" % newsletter_list_id)
+
+
+def newsletter_pre_save(sender, instance, **kwargs):
+    if not is_enabled() or instance.pk is None:
+        return
+
+    previous = (
+        sender.objects.filter(pk=instance.pk)
+        .values_list("newsletter_list", flat=True)
+        .first()
+    )
+
+    if previous != instance.newsletter_list_id:
+        invalidate_newsletter_list(previous)
+
+
+def newsletter_changed(sender, instance, **kwargs):
+    if not is_enabled():
+        return
+
+    get_cache().delete(make_key("newsletter", instance.pk, "list"))
+
+    invalidate_newsletter_list(instance.newsletter_list_id)
+
+
+def newsletter_item_changed(sender, instance, **kwargs):
+    from .models import Newsletter
+
+    if not is_enabled():
+        return
+
+    invalidate_newsletter_list(
+        Newsletter.objects.filter(pk=instance.newsletter_id)
+        .values_list("newsletter_list", flat=True)
+        .first()
+    )
+
+
+def newsletter_segment_changed(sender, instance, **kwargs):
+    if is_enabled():
+        invalidate_newsletter_list(instance.newsletter_list_id)
+
+
+def newsletter_list_changed(sender, instance, **kwargs):
+    if is_enabled():
+        bump_version("lists")
+
+        invalidate_newsletter_list(instance.pk)
+
+
+def connect_signals():
+    from .models import Newsletter, NewsletterItem, NewsletterList, NewsletterSegment
+
+    pre_save.connect(newsletter_pre_save, sender=Newsletter)
+
+    for signal in (post_save, post_delete):
+        signal.connect(newsletter_changed, sender=Newsletter)
+        signal.connect(newsletter_item_changed, sender=NewsletterItem)
+        signal.connect(newsletter_segment_changed, sender=NewsletterSegment)
+        signal.connect(newsletter_list_changed, sender=NewsletterList)
@@ -1,7 +1,8 @@
 from django import forms
+from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 
-from .backends import get_backend
+from .backends import get_backend_instance
 from .tasks import subscribe, unsubscribe
 
 
@@ -15,12 +16,12 @@ class SubscriptionForm(forms.Form):
     def __init__(self, *args, **kwargs):
         self.newsletter_list = kwargs.pop("newsletter_list", None)
 
-        backend_klass = get_backend()
-
-        self.backend = backend_klass()
-
         super(SubscriptionForm, self).__init__(*args, **kwargs)
 
+    @cached_property
+    def backend(self):
+        return get_backend_instance()
+
     def save(self, user=None):
         subscribe.delay(
             self.cleaned_data.get("receiver"),
@@ -40,12 +41,12 @@ class UnsubscribeForm(forms.Form):
     def __init__(self, *args, **kwargs):
         self.newsletter_list = kwargs.pop("newsletter_list", None)
 
-        backend_klass = get_backend()
-
-        self.backend = backend_klass()
-
         super(UnsubscribeForm, self).__init__(*args, **kwargs)
 
+    @cached_property
+    def backend(self):
+        return get_backend_instance()
+
     def save(self, user=None):
         from_all = self.cleaned_data.get("from_all", False)
 
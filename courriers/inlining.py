@@ -0,0 +1,470 @@
+import re
+
+from collections import namedtuple
+from functools import lru_cache
+from html import escape
+from html.parser import HTMLParser
+
+Rule = namedtuple("Rule", ["selector", "specificity", "order", "declarations"])
+
+VOID_ELEMENTS = frozenset(
+    (
+        "area",
+        "base",
+        "br",
+        "col",
+        "embed",
+        "hr",
+        "img",
+        "input",
+        "link",
+        "meta",
+        "param",
+        "source",
+        "track",
+        "wbr",
+    )
+)
+
+RAW_TEXT_ELEMENTS = frozenset(("pre", "textarea", "script", "style"))
+
+REDUNDANT_ATTRIBUTES = {
+    "script": {"type": "text/javascript", "language": "javascript"},
+    "style": {"type": "text/css"},
+    "link": {"type": "text/css"},
+    "form": {"method": "get"},
+    "input": {"type": "text"},
+}
+
+EMPTY_ATTRIBUTES = frozenset(("class", "id", "style"))
+
+STYLE_RE = re.compile(r"<style\b[^>]*>(.*?)</style\s*>", re.I | re.S)
+COMMENT_RE = re.compile(r"/\*.*?\*/", re.S)
+WHITESPACE_RE = re.compile(r"\s+")
+COMPOUND_RE = re.compile(r"^(\*|[a-zA-Z][\w-]*)?((?:[.#][\w-]+)*)$")
+SIMPLE_RE = re.compile(r"[.#][\w-]+")
+CSS_PUNCTUATION_RE = re.compile(r"\s*([{};,>])\s*")
+
+
+class Selector(object):
+    """
+    A selector made of type, class and id compounds joined by descendant or
+    child combinators, matched from right to left against the ancestors of
+    an element.
+    """
+
+    def __init__(self, compounds, combinators):
+        self.compounds = compounds
+        self.combinators = combinators
+
+    @classmethod
+    def parse(cls, text):
+        tokens = text.replace(">", " > ").split()
+
+        compounds = []
+        combinators = []
+        combinator = " "
+
+        for token in tokens:
+            if token == ">":
+                combinator = ">"
+                continue
+
+            match = COMPOUND_RE.match(token)
+
+            if match is None:
+                return None
+
+            tag, simple = match.groups()
+
+            classes = frozenset(s[1:] for s in SIMPLE_RE.findall(simple) if s[0] == ".")
+            ids = [s[1:] for s in SIMPLE_RE.findall(simple) if s[0] == "#"]
+
+            if len(ids) > 1:
+                return None
+
+            if compounds:
+                combinators.append(combinator)
+
+            compounds.append(
+                (
+                    tag.lower() if tag and tag != "*" else None,
+                    classes,
+                    ids[0] if ids else None,
+                )
+            )
+            combinator = " "
+
+        if not compounds:
+            return None
+
+        return cls(compounds, combinators)
+
+    @property
+    def specificity(self):
+        return (
+            sum(1 for tag, classes, id in self.compounds if id),
+            sum(len(classes) for tag, classes, id in self.compounds),
+            sum(1 for tag, classes, id in self.compounds if tag),
+        )
+
+    @property
+    def key(self):
+        tag, classes, id = self.compounds[-1]
+
+        if id:
+            return ("#", id)
+
+        if classes:
+            return (".", min(classes))
+
+        return ("", tag)
+
+    @staticmethod
+    def _match_compound(compound, element):
+        tag, classes, id = compound
+
+        return (
+            (tag is None or tag == element[0])
+            and (id is None or id == element[1])
+            and classes <= element[2]
+        )
+
+    def match(self, element, ancestors):
+        if not self._match_compound(self.compounds[-1], element):
+            return False
+
+        position = len(ancestors)
+
+        for index in range(len(self.compounds) - 2, -1, -1):
+            compound = self.compounds[index]
+
+            if self.combinators[index] == ">":
+                position -= 1
+
+                if position < 0 or not self._match_compound(
+                    compound, ancestors[position]
+                ):
+                    return False
+            else:
+                while True:
+                    position -= 1
+
+                    if position < 0:
+                        return False
+
+                    if self._match_compound(compound, ancestors[position]):
+                        break
+
+        return True
+
+
+def parse_declarations(text):
+    declarations = []
+
+    for declaration in text.split(";"):
+        name, sep, value = declaration.partition(":")
+
+        name = name.strip().lower()
+        value = WHITESPACE_RE.sub(" ", value.strip())
+
+        if not sep or not name or not value:
+            continue
+
+        important = value.lower().endswith("!important")
+
+        if important:
+            value = value[: -len("!important")].rstrip()
+
+        declarations.append((name, value, important))
+
+    return declarations
+
+
+class Stylesheet(object):
+    """
+    The rules of a stylesheet indexed by the rightmost compound of their
+    selectors. Rules which cannot be inlined (at-rules, pseudo-classes,
+    attribute selectors...) are kept as ``remaining`` CSS.
+    """
+
+    def __init__(self, css):
+        self.rules = {}
+        self.remaining = []
+
+        css = COMMENT_RE.sub("", css)
+
+        order = 0
+        position = 0
+
+        while position < len(css):
+            start = css.find("{", position)
+
+            if start == -1:
+                break
+
+            prelude = css[position:start].strip()
+
+            if prelude.startswith("@"):
+                end = self._find_block_end(css, start)
+
+                self.remaining.append(
+                    "%s{%s}" % (prelude, css[start + 1 : end].strip())
+                )
+                position = end + 1
+
+                continue
+
+            end = css.find("}", start)
+
+            if end == -1:
+                end = len(css)
+
+            body = css[start + 1 : end]
+            position = end + 1
+
+            declarations = parse_declarations(body)
+
+            if not declarations:
+                continue
+
+            for text in prelude.split(","):
+                selector = Selector.parse(text)
+
+                if selector is None:
+                    self.remaining.append(
+                        "%s{%s}" % (text.strip(), format_declarations(declarations))
+                    )
+
+                    continue
+
+                order += 1
+
+                self.rules.setdefault(selector.key, []).append(
+                    Rule(selector, selector.specificity, order, declarations)
+                )
+
+    @staticmethod
+    def _find_block_end(css, start):
+        depth = 0
+
+        for index in range(start, len(css)):
+            if css[index] == "{":
+                depth += 1
+            elif css[index] == "}":
+                depth -= 1
+
+                if depth == 0:
+                    return index
+
+        return len(css)
+
+    def match(self, element, ancestors):
+        tag, id, classes = element
+
+        candidates = self.rules.get(("", None), []) + self.rules.get(("", tag), [])
+
+        if id:
+            candidates = candidates + self.rules.get(("#", id), [])
+
+        for cls in classes:
+            candidates = candidates + self.rules.get((".", cls), [])
+
+        return [rule for rule in candidates if rule.selector.match(element, ancestors)]
+
+
+@lru_cache(maxsize=32)
+def compile_stylesheet(css):
+    """
+    Parses a stylesheet once, the same template always embeds the same
+    stylesheet so it is only compiled on the first send.
+    """
+    return Stylesheet(css)
+
+
+def minify_css(css):
+    css = WHITESPACE_RE.sub(" ", COMMENT_RE.sub("", css))
+
+    return CSS_PUNCTUATION_RE.sub(r"\1", css).replace(";}", "}").strip()
+
+
+def format_declarations(declarations):
+    return ";".join(
+        "%s:%s%s" % (name, value, " !important" if important else "")
+        for name, value, important in declarations
+    )
+
+
+class HTMLRewriter(HTMLParser):
+    def __init__(self, stylesheet=None, minify=False):
+        HTMLParser.__init__(self, convert_charrefs=False)
+
+        self.stylesheet = stylesheet
+        self.minify = minify
+        self.output = []
+        self.ancestors = []
+        self.raw = 0
+
+    def rewrite(self, html):
+        self.feed(html)
+        self.close()
+
+        return "".join(self.output)
+
+    def get_style(self, element, attrs):
+        rules = self.stylesheet.match(element, self.ancestors)
+
+        inline = parse_declarations(attrs.get("style") or "")
+
+        if not rules:
+            return attrs.get("style")
+
+        weighted = []
+
+        for rule in rules:
+            for name, value, important in rule.declarations:
+                weighted.append(
+                    ((important, 0, rule.specificity, rule.order), name, value)
+                )
+
+        for order, (name, value, important) in enumerate(inline):
+            weighted.append(((important, 1, (0, 0, 0), order), name, value))
+
+        styles = {}
+
+        for weight, name, value in sorted(weighted, key=lambda w: w[0]):
+            styles.pop(name, None)
+            styles[name] = value
+
+        return ";".join("%s:%s" % item for item in styles.items())
+
+    def format_attrs(self, tag, attrs):
+        redundant = REDUNDANT_ATTRIBUTES.get(tag, {})
+
+        parts = []
+
+        for name, value in attrs.items():
+            if self.minify:
+                if value is not None and redundant.get(name) == value.strip().lower():
+                    continue
+
+                if name in EMPTY_ATTRIBUTES and not (value or "").strip():
+                    continue
+
+            if value is None:
+                parts.append(" %s" % name)
+            else:
+                parts.append(' %s="%s"' % (name, escape(value, quote=True)))
+
+        return "".join(parts)
+
+    def start(self, tag, attrs, closed=False):
+        attrs = dict(attrs)
+
+        element = (
+            tag,
+            attrs.get("id"),
+            frozenset((attrs.get("class") or "").split()),
+        )
+
+        if self.stylesheet is not None and tag not in ("html", "head", "style"):
+            style = self.get_style(element, attrs)
+
+            if style:
+                attrs["style"] = style
+
+        self.output.append(
+            "<%s%s%s>" % (tag, self.format_attrs(tag, attrs), " /" if closed else "")
+        )
+
+        if not closed and tag not in VOID_ELEMENTS:
+            self.ancestors.append(element)
+
+            if tag in RAW_TEXT_ELEMENTS:
+                self.raw += 1
+
+    def handle_starttag(self, tag, attrs):
+        self.start(tag, attrs)
+
+    def handle_startendtag(self, tag, attrs):
+        self.start(tag, attrs, closed=True)
+
+    def handle_endtag(self, tag):
+        for index in range(len(self.ancestors) - 1, -1, -1):
+            if self.ancestors[index][0] == tag:
+                for element in self.ancestors[index:]:
+                    if element[0] in RAW_TEXT_ELEMENTS:
+                        self.raw -= 1
+
+                del self.ancestors[index:]
+
+                break
+
+        self.output.append("</%s>" % tag)
+
+    def handle_data(self, data):
+        if self.minify:
+            if not self.raw:
+                data = WHITESPACE_RE.sub(" ", data)
+
+                if (
+                    data.startswith(" ")
+                    and self.output
+                    and self.output[-1].endswith(" ")
+                ):
+                    data = data[1:]
+            elif self.ancestors and self.ancestors[-1][0] == "style":
+                data = minify_css(data)
+
+        self.output.append(data)
+
+    def handle_entityref(self, name):
+        self.output.append("&%s;" % name)
+
+    def handle_charref(self, name):
+        self.output.append("&#%s;" % name)
+
+    def handle_comment(self, data):
+        if not self.minify or data.startswith("[if") or data.startswith("<![endif"):
+            self.output.append("<!--%s-->" % data)
+
+    def handle_decl(self, decl):
+        self.output.append("<!%s>" % decl)
+
+    def handle_pi(self, data):
+        self.output.append("<?%s>" % data)
+
+    def unknown_decl(self, data):
+        self.output.append("<![%s]>" % data)
+
+
+def inline_css(html, minify=True):
+    """
+    Moves the rules of the ``<style>`` blocks to the style attribute of the
+    elements they match and minifies the HTML. Rules which cannot be inlined
+    are kept in a single ``<style>`` block.
+    """
+    blocks = STYLE_RE.findall(html)
+
+    if not blocks:
+        return minify_html(html) if minify else html
+
+    stylesheet = compile_stylesheet("\n".join(blocks))
+
+    remaining = "".join(stylesheet.remaining)
+
+    replacement = ["<style>%s</style>" % remaining if remaining else ""]
+
+    def replace(match):
+        return replacement.pop() if replacement else ""
+
+    html = STYLE_RE.sub(replace, html)
+
+    return HTMLRewriter(stylesheet=stylesheet, minify=minify).rewrite(html)
+
+
+def minify_html(html):
+    """
+    Collapses whitespace and drops comments and redundant attributes.
+    """
+    return HTMLRewriter(minify=True).rewrite(html)
@@ -0,0 +1,80 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+
+from courriers import settings
+from courriers.models import Newsletter
+from courriers.utils import load_class
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the cost per message and the bytes saved by the pre-processors "
+        "on newsletter_raw_detail.html"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("newsletter_id", type=int, nargs="?")
+        parser.add_argument("--iterations", type=int, default=100)
+        parser.add_argument(
+            "--template", default="courriers/newsletter_raw_detail.html"
+        )
+        parser.add_argument(
+            "--pre-processor",
+            action="append",
+            dest="pre_processors",
+            help="Pre-processor to benchmark, COURRIERS_PRE_PROCESSORS "
+            "or courriers.inlining.inline_css by default",
+        )
+
+    def handle(self, *args, **options):
+        if options["newsletter_id"]:
+            newsletter = Newsletter.objects.get(pk=options["newsletter_id"])
+        else:
+            newsletter = Newsletter.objects.order_by("-published_at").first()
+
+        html = render_to_string(
+            options["template"],
+            {
+                "object": newsletter,
+                "items": (
+                    newsletter.items.prefetch_content_objects() if newsletter else []
+                ),
+            },
+        )
+
+        paths = (
+            options["pre_processors"]
+            or settings.PRE_PROCESSORS
+            or ["courriers.inlining.inline_css"]
+        )
+
+        iterations = options["iterations"]
+
+        for path in paths:
+            processor = load_class(path, "COURRIERS_PRE_PROCESSORS")
+
+            output = processor(html)
+
+            started_at = time.perf_counter()
+
+            for i in range(iterations):
+                processor(html)
+
+            elapsed = time.perf_counter() - started_at
+
+            size = len(html.encode("utf-8"))
+            saved = size - len(output.encode("utf-8"))
+
+            self.stdout.write(
+                "%s: %.3f ms per message, %d bytes -> %d bytes (%d saved, %.1f%%)"
+                % (
+                    path,
+                    elapsed * 1000 / iterations,
+                    size,
+                    size - saved,
+                    saved,
+                    saved * 100.0 / size if size else 0,
+                )
+            )
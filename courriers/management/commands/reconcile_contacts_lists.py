@@ -0,0 +1,56 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from courriers.backends import get_backend_instance
+from courriers.models import NewsletterList
+from courriers.sync import ContactListReconciliation
+
+
+class Command(BaseCommand):
+    help = "Apply the differences between local subscribers and provider lists"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "slugs",
+            nargs="*",
+            help="Lists to reconcile, every list with a list_id by default",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, help="Number of contacts updated per call"
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report the differences",
+        )
+
+    def handle(self, *args, **options):
+        newsletter_lists = NewsletterList.objects.filter(list_id__isnull=False)
+
+        if options["slugs"]:
+            newsletter_lists = newsletter_lists.filter(slug__in=options["slugs"])
+
+        backend = get_backend_instance()
+
+        for newsletter_list in newsletter_lists:
+            try:
+                stats = ContactListReconciliation(
+                    backend,
+                    newsletter_list,
+                    batch_size=options["batch_size"],
+                    dry_run=options["dry_run"],
+                ).run()
+            except NotImplementedError:
+                raise CommandError(
+                    "%s cannot list the contacts of its lists"
+                    % backend.__class__.__name__
+                )
+
+            self.stdout.write(
+                "%s: %d subscribed, %d unsubscribed, %d unsubscribed locally"
+                % (
+                    newsletter_list,
+                    stats["subscribed"],
+                    stats["unsubscribed"],
+                    stats["locally_unsubscribed"],
+                )
+            )
@@ -0,0 +1,63 @@
+from asgiref.sync import async_to_sync
+
+from django.core.management.base import BaseCommand, CommandError
+
+from courriers.models import Newsletter
+
+
+class Command(BaseCommand):
+    help = "Send newsletters as Mailjet campaigns concurrently"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "newsletter_ids", nargs="*", type=int, help="Newsletters to send"
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            dest="all",
+            default=False,
+            help="Send every online newsletter not sent yet",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            dest="dry_run",
+            default=False,
+            help="List the newsletters which would be sent",
+        )
+
+    async def send(self, newsletters):
+        from courriers.backends.mailjet_async import AsyncMailjetRESTBackend
+
+        async with AsyncMailjetRESTBackend() as backend:
+            return await backend.send_campaigns(newsletters)
+
+    def handle(self, *args, **options):
+        if not options["newsletter_ids"] and not options["all"]:
+            raise CommandError("Give the ids of the newsletters to send or --all")
+
+        newsletters = Newsletter.objects.status_online().filter(sent=False)
+
+        if options["newsletter_ids"]:
+            newsletters = newsletters.filter(pk__in=options["newsletter_ids"])
+
+        newsletters = list(
+            newsletters.select_related("newsletter_list", "newsletter_segment")
+        )
+
+        if options["dry_run"]:
+            for newsletter in newsletters:
+                self.stdout.write("%s: would be sent" % newsletter)
+
+            return
+
+        results = async_to_sync(self.send)(newsletters)
+
+        for newsletter, result in zip(newsletters, results):
+            if isinstance(result, Exception):
+                self.stderr.write("%s: %s" % (newsletter, result))
+            elif not newsletter.reached_campaign_step(newsletter.CAMPAIGN_STEP_SENT):
+                self.stderr.write("%s: not sent" % newsletter)
+            else:
+                self.stdout.write("%s: sent" % newsletter)
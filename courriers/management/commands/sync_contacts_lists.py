@@ -0,0 +1,72 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from courriers.backends import get_backend_instance
+from courriers.models import NewsletterList
+from courriers.sync import ContactListSync
+from courriers.tasks import sync_contacts_list
+
+
+class Command(BaseCommand):
+    help = "Upload the subscribers of newsletter lists to the provider lists"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "slugs",
+            nargs="*",
+            help="Lists to sync, every list with a list_id by default",
+        )
+        parser.add_argument("--lang", help="Only sync subscribers in this language")
+        parser.add_argument(
+            "--csv", action="store_true", help="Upload batches as CSV import jobs"
+        )
+        parser.add_argument(
+            "--batch-size", type=int, help="Number of contacts uploaded per call"
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore the checkpoint of a previous sync",
+        )
+        parser.add_argument(
+            "--async",
+            action="store_true",
+            dest="run_async",
+            help="Sync each list in a Celery task",
+        )
+
+    def handle(self, *args, **options):
+        newsletter_lists = NewsletterList.objects.filter(list_id__isnull=False)
+
+        if options["slugs"]:
+            newsletter_lists = newsletter_lists.filter(slug__in=options["slugs"])
+
+        backend = get_backend_instance()
+
+        for newsletter_list in newsletter_lists:
+            if options["run_async"]:
+                sync_contacts_list.delay(
+                    newsletter_list.pk, lang=options["lang"], csv=options["csv"]
+                )
+
+                self.stdout.write("%s: queued" % newsletter_list)
+
+                continue
+
+            sync = ContactListSync(
+                backend,
+                newsletter_list,
+                lang=options["lang"],
+                csv=options["csv"],
+                batch_size=options["batch_size"],
+            )
+
+            started_at = time.time()
+
+            processed = sync.run(restart=options["restart"])
+
+            self.stdout.write(
+                "%s: %d contacts uploaded in %.1fs"
+                % (newsletter_list, processed, time.time() - started_at)
+            )
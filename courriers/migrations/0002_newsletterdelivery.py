@@ -0,0 +1,31 @@
+# Generated by Django 3.2.25 on 2026-10-18 14:42
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courriers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NewsletterDelivery',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('subscriber_id', models.PositiveIntegerField()),
+                ('email', models.EmailField(max_length=250)),
+                ('status', models.PositiveIntegerField(choices=[(1, 'Sent'), (2, 'Failed')], db_index=True)),
+                ('attempt', models.PositiveIntegerField(default=1)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('newsletter', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='deliveries', to='courriers.newsletter')),
+            ],
+            options={
+                'abstract': False,
+                'unique_together': {('newsletter', 'email')},
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 3.2.25 on 2026-10-18 14:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courriers', '0002_newsletterdelivery'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NewsletterListOperation',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('list_id', models.IntegerField()),
+                ('email', models.EmailField(max_length=250)),
+                ('action', models.PositiveIntegerField(choices=[(1, 'Subscribe'), (2, 'Unsubscribe')])),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
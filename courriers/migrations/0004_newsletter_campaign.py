@@ -0,0 +1,23 @@
+# Generated by Django 3.2.25 on 2026-10-18 14:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courriers', '0003_newsletterlistoperation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsletter',
+            name='campaign_id',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='newsletter',
+            name='campaign_step',
+            field=models.PositiveIntegerField(blank=True, choices=[(1, 'Draft created'), (2, 'Content uploaded'), (3, 'Sent')], null=True),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.25 on 2026-10-18 15:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courriers', '0004_newsletter_campaign'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='newsletter',
+            index=models.Index(fields=['newsletter_list', 'status', 'published_at'], name='courriers_newsletter_list_pub'),
+        ),
+        migrations.AddIndex(
+            model_name='newsletter',
+            index=models.Index(fields=['status', 'published_at'], name='courriers_newsletter_stat_pub'),
+        ),
+    ]
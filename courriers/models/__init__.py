@@ -10,3 +10,7 @@ NewsletterSegment = load_class(settings.NEWSLETTERSEGMENT_MODEL)
 Newsletter = load_class(settings.NEWSLETTER_MODEL)
 
 NewsletterItem = load_class(settings.NEWSLETTERITEM_MODEL)
+
+NewsletterDelivery = load_class(settings.NEWSLETTERDELIVERY_MODEL)
+
+NewsletterListOperation = load_class(settings.NEWSLETTERLISTOPERATION_MODEL)
@@ -1,7 +1,24 @@
 # -*- coding: utf-8 -*-
+from django.db import models
+
 from courriers import base_models as base
 
 
 class Newsletter(base.Newsletter):
     class Meta(base.Newsletter.Meta):
         abstract = False
+        # Fixed names, a pattern on the abstract model would go over the 30
+        # characters allowed for the swapped ones
+        indexes = [
+            # status_online() on a list: the archive, its lang join on the
+            # segments primary key and get_previous/get_next
+            models.Index(
+                fields=["newsletter_list", "status", "published_at"],
+                name="courriers_newsletter_list_pub",
+            ),
+            # status_online() across lists
+            models.Index(
+                fields=["status", "published_at"],
+                name="courriers_newsletter_stat_pub",
+            ),
+        ]
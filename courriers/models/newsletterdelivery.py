@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+from courriers import base_models as base
+
+
+class NewsletterDelivery(base.NewsletterDelivery):
+    class Meta(base.NewsletterDelivery.Meta):
+        abstract = False
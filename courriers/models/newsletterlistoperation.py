@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+from courriers import base_models as base
+
+
+class NewsletterListOperation(base.NewsletterListOperation):
+    class Meta(base.NewsletterListOperation.Meta):
+        abstract = False
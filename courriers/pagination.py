@@ -0,0 +1,205 @@
+import datetime
+
+from django.conf import settings
+from django.core.paginator import EmptyPage, PageNotAnInteger
+from django.db.models import Q
+from django.utils import timezone
+
+EPOCH = datetime.datetime(1970, 1, 1)
+
+DIRECTION_NEXT = "n"
+DIRECTION_PREVIOUS = "p"
+
+
+def encode_datetime(value):
+    if timezone.is_aware(value):
+        value = timezone.make_naive(value, timezone.utc)
+
+    delta = value - EPOCH
+
+    return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+
+def decode_datetime(value):
+    value = EPOCH + datetime.timedelta(microseconds=value)
+
+    if settings.USE_TZ:
+        value = timezone.make_aware(value, timezone.utc)
+
+    return value
+
+
+class KeysetPage(object):
+    """
+    A page of a ``KeysetPaginator``, it only knows whether there are
+    pages around it and the cursors to reach them.
+    """
+
+    def __init__(self, object_list, number, has_next, has_previous, field):
+        self.object_list = object_list
+        self.number = number
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.field = field
+
+    def __repr__(self):
+        return "<Page %s>" % self.number
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def next_page_number(self):
+        if not self.has_next():
+            raise EmptyPage("That page contains no results")
+
+        return self.number + 1
+
+    def previous_page_number(self):
+        if not self.has_previous():
+            raise EmptyPage("That page number is less than 1")
+
+        return self.number - 1
+
+    def make_cursor(self, direction, number, obj):
+        return "%s.%d.%d.%d" % (
+            direction,
+            number,
+            encode_datetime(getattr(obj, self.field)),
+            obj.pk,
+        )
+
+    @property
+    def next_cursor(self):
+        if not self.has_next():
+            return None
+
+        return self.make_cursor(
+            DIRECTION_NEXT, self.next_page_number(), self.object_list[-1]
+        )
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous():
+            return None
+
+        return self.make_cursor(
+            DIRECTION_PREVIOUS, self.previous_page_number(), self.object_list[0]
+        )
+
+
+class KeysetPaginator(object):
+    """
+    Paginates a queryset by ``(field, pk)`` in descending order without
+    counting its rows nor skipping them with an OFFSET.
+
+    A cursor points after the last row of a page (or before the first one to
+    go backwards) so every page is a single indexed range scan. Page numbers
+    are still accepted, the boundary of the page is then looked up on the
+    ``(field, pk)`` columns only.
+    """
+
+    def __init__(self, object_list, per_page, field="published_at"):
+        self.object_list = object_list.order_by("-%s" % field, "-pk")
+        self.per_page = int(per_page)
+        self.field = field
+
+    def validate_number(self, number):
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger("That page number is not an integer")
+
+        if number < 1:
+            raise EmptyPage("That page number is less than 1")
+
+        return number
+
+    def decode_cursor(self, cursor):
+        try:
+            direction, number, value, pk = cursor.split(".")
+
+            if direction not in (DIRECTION_NEXT, DIRECTION_PREVIOUS):
+                raise ValueError(direction)
+
+            return direction, int(number), (decode_datetime(int(value)), int(pk))
+        except (OverflowError, ValueError):
+            raise PageNotAnInteger("That cursor is not valid")
+
+    def get_boundary(self, number):
+        # Only the (field, pk) pairs before the page are read, from the index
+        offset = (number - 1) * self.per_page
+
+        boundary = self.object_list.values_list(self.field, "pk")[
+            offset - 1 : offset
+        ].first()
+
+        if boundary is None:
+            raise EmptyPage("That page contains no results")
+
+        return boundary
+
+    def get_filter(self, direction, boundary):
+        value, pk = boundary
+
+        if direction == DIRECTION_NEXT:
+            lookup = "lt"
+        else:
+            lookup = "gt"
+
+        return Q(**{"%s__%s" % (self.field, lookup): value}) | Q(
+            **{self.field: value, "pk__%s" % lookup: pk}
+        )
+
+    def page(self, number=1, cursor=None):
+        if cursor:
+            direction, number, boundary = self.decode_cursor(cursor)
+
+            number = self.validate_number(number)
+        else:
+            number = self.validate_number(number)
+
+            direction = DIRECTION_NEXT
+            boundary = self.get_boundary(number) if number > 1 else None
+
+        queryset = self.object_list
+
+        if boundary is not None:
+            queryset = queryset.filter(self.get_filter(direction, boundary))
+
+        if direction == DIRECTION_PREVIOUS:
+            queryset = queryset.reverse()
+
+        object_list = list(queryset[: self.per_page + 1])
+
+        has_more = len(object_list) > self.per_page
+
+        object_list = object_list[: self.per_page]
+
+        if not object_list and number > 1:
+            raise EmptyPage("That page contains no results")
+
+        if direction == DIRECTION_PREVIOUS:
+            object_list.reverse()
+
+            # Rows published since the cursor was made shift the page numbers
+            if has_more:
+                number = max(number, 2)
+
+            return KeysetPage(object_list, number, True, has_more, self.field)
+
+        return KeysetPage(object_list, number, has_more, number > 1, self.field)
@@ -0,0 +1,63 @@
+import hashlib
+import threading
+
+from collections import OrderedDict
+from functools import lru_cache
+
+from .utils import load_class
+
+
+class PreProcessorPipeline(object):
+    """
+    Chains the ``COURRIERS_PRE_PROCESSORS`` callables and memoizes their
+    output by a content hash of the input HTML in a bounded LRU.
+    """
+
+    def __init__(self, processors, cache_size=32):
+        self.processors = processors
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __call__(self, html):
+        if not self.processors:
+            return html
+
+        key = hashlib.sha1(html.encode("utf-8")).digest()
+
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+
+                return self._cache[key]
+
+        for processor in self.processors:
+            html = processor(html)
+
+        with self._lock:
+            self._cache[key] = html
+
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        return html
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+
+@lru_cache(maxsize=None)
+def compile_pre_processors(paths, cache_size):
+    return PreProcessorPipeline(
+        [load_class(path, "COURRIERS_PRE_PROCESSORS") for path in paths],
+        cache_size=cache_size,
+    )
+
+
+def get_pre_processor():
+    from . import settings
+
+    return compile_pre_processors(
+        tuple(settings.PRE_PROCESSORS), settings.PRE_PROCESSORS_CACHE_SIZE
+    )
@@ -0,0 +1,91 @@
+import time
+
+from django.core.cache import caches
+
+from .settings import CACHE_ALIAS, PROGRESS_TIMEOUT
+
+
+class Progress(object):
+    key_prefix = None
+
+    def __init__(self, id, cache=None):
+        self.id = id
+        self.cache = cache or caches[CACHE_ALIAS]
+
+    def make_key(self, name):
+        return "%s:%s:%s" % (self.key_prefix, self.id, name)
+
+    def start(self, total):
+        self.cache.set_many(
+            {
+                self.make_key("total"): total,
+                self.make_key("processed"): 0,
+                self.make_key("errors"): 0,
+                self.make_key("started_at"): time.time(),
+                self.make_key("finished_at"): None,
+            },
+            PROGRESS_TIMEOUT,
+        )
+
+    def _incr(self, name, delta):
+        if not delta:
+            return
+
+        try:
+            self.cache.incr(self.make_key(name), delta)
+        except ValueError:
+            self.cache.add(self.make_key(name), delta, PROGRESS_TIMEOUT)
+
+    def update(self, processed=0, errors=0):
+        self._incr("processed", processed)
+        self._incr("errors", errors)
+
+    def finish(self):
+        self.cache.set(self.make_key("finished_at"), time.time(), PROGRESS_TIMEOUT)
+
+    def get(self):
+        names = ("total", "processed", "errors", "started_at", "finished_at")
+
+        values = self.cache.get_many([self.make_key(name) for name in names])
+
+        progress = {name: values.get(self.make_key(name)) for name in names}
+
+        if progress["started_at"] is None:
+            return None
+
+        processed = progress["processed"] or 0
+        total = progress["total"] or 0
+
+        elapsed = (progress["finished_at"] or time.time()) - progress["started_at"]
+
+        progress["rate"] = processed / elapsed if elapsed > 0 else 0
+        progress["eta"] = (
+            (total - processed) / progress["rate"]
+            if progress["rate"] and not progress["finished_at"]
+            else None
+        )
+        progress["finished"] = progress["finished_at"] is not None
+
+        return progress
+
+
+class SendProgress(Progress):
+    """
+    Tracks the progress of a newsletter send in the cache so every worker
+    sending a shard can update it and the admin can display it.
+    """
+
+    key_prefix = "courriers:progress"
+
+    def __init__(self, newsletter_id, cache=None):
+        super(SendProgress, self).__init__(newsletter_id, cache=cache)
+
+        self.newsletter_id = newsletter_id
+
+
+class SyncProgress(Progress):
+    """
+    Tracks the upload of a contact list to the provider.
+    """
+
+    key_prefix = "courriers:sync"
@@ -0,0 +1,119 @@
+from urllib.parse import quote, urljoin
+
+from django.apps import apps
+from django.core.exceptions import ImproperlyConfigured
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils import translation
+from django.utils.functional import cached_property
+from django.utils.html import escape
+
+from .settings import SITE_URL
+
+SUBSCRIBER_EMAIL_PLACEHOLDER = "__courriers_subscriber_email__"
+
+UNSUBSCRIBE_URL_PLACEHOLDER = "__courriers_unsubscribe_url__"
+
+
+def get_site_url():
+    """
+    Returns the URL emails link to, ``COURRIERS_SITE_URL`` or the domain of
+    the current ``Site``.
+    """
+    if SITE_URL:
+        return SITE_URL
+
+    if apps.is_installed("django.contrib.sites"):
+        from django.contrib.sites.models import Site
+
+        return "https://%s" % Site.objects.get_current().domain
+
+    raise ImproperlyConfigured(
+        "Set COURRIERS_SITE_URL or install django.contrib.sites to build "
+        "the links of the emails"
+    )
+
+
+class SubscriberPlaceholder(object):
+    email = SUBSCRIBER_EMAIL_PLACEHOLDER
+
+    def __init__(self, lang=None):
+        self.lang = lang
+
+
+class NewsletterRenderer(object):
+    """
+    Renders the shared body of a newsletter once per (language, template)
+    and only fills in the subscriber specific parts (email and unsubscribe
+    link) for each recipient.
+    """
+
+    def __init__(self, newsletter, pre_processor=None):
+        self.newsletter = newsletter
+        self.pre_processor = pre_processor
+        self._items = None
+        self._bodies = {}
+
+    @property
+    def items(self):
+        if self._items is None:
+            self._items = list(self.newsletter.items.prefetch_content_objects())
+
+            for item in self._items:
+                item.newsletter = self.newsletter
+
+        return self._items
+
+    def get_context(self, lang):
+        return {
+            "object": self.newsletter,
+            "items": self.items,
+            "subscriber": SubscriberPlaceholder(lang),
+            "unsubscribe_url": UNSUBSCRIBE_URL_PLACEHOLDER,
+        }
+
+    def get_body(self, template_name, html=False):
+        lang = translation.get_language()
+        key = (self.newsletter.pk, lang, template_name)
+
+        if key not in self._bodies:
+            body = render_to_string(template_name, self.get_context(lang))
+
+            if html and self.pre_processor is not None:
+                body = self.pre_processor(body)
+
+            self._bodies[key] = body
+
+        return self._bodies[key]
+
+    @cached_property
+    def unsubscribe_url(self):
+        return urljoin(
+            get_site_url(),
+            reverse(
+                "newsletter_list_unsubscribe",
+                kwargs={"slug": self.newsletter.newsletter_list.slug},
+            ),
+        )
+
+    def get_unsubscribe_url(self, subscriber):
+        return "%s?email=%s" % (self.unsubscribe_url, quote(subscriber.email))
+
+    def render(self, template_name, subscriber, html=False):
+        body = self.get_body(template_name, html=html)
+
+        if SUBSCRIBER_EMAIL_PLACEHOLDER in body:
+            value = subscriber.email
+
+            body = body.replace(
+                SUBSCRIBER_EMAIL_PLACEHOLDER, escape(value) if html else value
+            )
+
+        if UNSUBSCRIBE_URL_PLACEHOLDER in body:
+            value = self.get_unsubscribe_url(subscriber)
+
+            body = body.replace(
+                UNSUBSCRIBE_URL_PLACEHOLDER, escape(value) if html else value
+            )
+
+        return body
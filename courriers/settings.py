@@ -19,6 +19,28 @@ MAILJET_CONTACTFILTER_LIMIT = getattr(
 
 MAILJET_API_SECRET_KEY = getattr(settings, "COURRIERS_MAILJET_API_SECRET_KEY", "")
 
+MAILJET_API_URL = getattr(
+    settings, "COURRIERS_MAILJET_API_URL", "https://api.mailjet.com/"
+)
+
+MAILJET_POOL_SIZE = getattr(settings, "COURRIERS_MAILJET_POOL_SIZE", 10)
+
+MAILJET_TIMEOUT = getattr(settings, "COURRIERS_MAILJET_TIMEOUT", 30)
+
+MAILJET_MAX_RETRIES = getattr(settings, "COURRIERS_MAILJET_MAX_RETRIES", 3)
+
+MAILJET_BACKOFF_FACTOR = getattr(settings, "COURRIERS_MAILJET_BACKOFF_FACTOR", 0.5)
+
+MAILJET_BATCH_SUBSCRIPTIONS = getattr(
+    settings, "COURRIERS_MAILJET_BATCH_SUBSCRIPTIONS", False
+)
+
+OPERATIONS_FLUSH_LIMIT = getattr(
+    settings, "COURRIERS_OPERATIONS_FLUSH_LIMIT", 10000
+)
+
+SYNC_CSV_BATCH_SIZE = getattr(settings, "COURRIERS_SYNC_CSV_BATCH_SIZE", 50000)
+
 DEFAULT_FROM_EMAIL = getattr(
     settings, "COURRIERS_DEFAULT_FROM_EMAIL", settings.DEFAULT_FROM_EMAIL
 )
@@ -29,10 +51,42 @@ ALLOWED_LANGUAGES = getattr(settings, "COURRIERS_ALLOWED_LANGUAGES", settings.LA
 
 PRE_PROCESSORS = getattr(settings, "COURRIERS_PRE_PROCESSORS", ())
 
+PRE_PROCESSORS_CACHE_SIZE = getattr(settings, "COURRIERS_PRE_PROCESSORS_CACHE_SIZE", 32)
+
+SITE_URL = getattr(settings, "COURRIERS_SITE_URL", None)
+
 PAGINATE_BY = getattr(settings, "COURRIERS_PAGINATE_BY", 9)
 
+KEYSET_PAGINATION = getattr(settings, "COURRIERS_KEYSET_PAGINATION", False)
+
 FAIL_SILENTLY = getattr(settings, "COURRIERS_FAIL_SILENTLY", False)
 
+SEND_CHUNK_SIZE = getattr(settings, "COURRIERS_SEND_CHUNK_SIZE", 500)
+
+DELIVERY_POOL_SIZE = getattr(settings, "COURRIERS_DELIVERY_POOL_SIZE", 0)
+
+DELIVERY_QUEUE_SIZE = getattr(settings, "COURRIERS_DELIVERY_QUEUE_SIZE", None)
+
+THROTTLE_RATE = getattr(settings, "COURRIERS_THROTTLE_RATE", 0)
+
+THROTTLE_BURST = getattr(settings, "COURRIERS_THROTTLE_BURST", None)
+
+THROTTLE_CACHE_ALIAS = getattr(settings, "COURRIERS_THROTTLE_CACHE_ALIAS", None)
+
+SEND_SHARD_SIZE = getattr(settings, "COURRIERS_SEND_SHARD_SIZE", 10000)
+
+DELIVERY_LEDGER = getattr(settings, "COURRIERS_DELIVERY_LEDGER", False)
+
+CACHE_ALIAS = getattr(settings, "COURRIERS_CACHE_ALIAS", "default")
+
+PROGRESS_TIMEOUT = getattr(settings, "COURRIERS_PROGRESS_TIMEOUT", 60 * 60 * 24)
+
+PAGE_CACHE_TIMEOUT = getattr(settings, "COURRIERS_PAGE_CACHE_TIMEOUT", 0)
+
+CONTENT_OBJECTS_SELECT_RELATED = getattr(
+    settings, "COURRIERS_CONTENT_OBJECTS_SELECT_RELATED", {}
+)
+
 NEWSLETTERLIST_MODEL = getattr(
     settings,
     "COURRIERS_NEWSLETTERLIST_MODEL",
@@ -54,3 +108,19 @@ NEWSLETTERSEGMENT_MODEL = getattr(
     "COURRIERS_NEWSLETTERSEGMENT_MODEL",
     "courriers.models.newslettersegment.NewsletterSegment",
 )
+
+NEWSLETTERSUBSCRIBER_MODEL = getattr(
+    settings, "COURRIERS_NEWSLETTERSUBSCRIBER_MODEL", None
+)
+
+NEWSLETTERDELIVERY_MODEL = getattr(
+    settings,
+    "COURRIERS_NEWSLETTERDELIVERY_MODEL",
+    "courriers.models.newsletterdelivery.NewsletterDelivery",
+)
+
+NEWSLETTERLISTOPERATION_MODEL = getattr(
+    settings,
+    "COURRIERS_NEWSLETTERLISTOPERATION_MODEL",
+    "courriers.models.newsletterlistoperation.NewsletterListOperation",
+)
@@ -0,0 +1,267 @@
+import hashlib
+
+from array import array
+
+from django.core.cache import caches
+from django.core.exceptions import FieldDoesNotExist
+from django.utils import timezone as datetime
+
+from .progress import SyncProgress
+from .settings import CACHE_ALIAS, MAILJET_CONTACTSLIST_LIMIT, SYNC_CSV_BATCH_SIZE
+from .utils import array_contains, sorted_array
+
+
+def hash_email(email):
+    """
+    Returns a 64 bits hash of the normalized email.
+    """
+    digest = hashlib.blake2b(
+        email.strip().lower().encode("utf-8"), digest_size=8
+    ).digest()
+
+    return int.from_bytes(digest, "big")
+
+
+def iter_subscriber_batches(subscribers, batch_size, checkpoint=None):
+    """
+    Yields lists of ``(pk, email)`` of the subscribers, fetching
+    ``batch_size`` rows at a time by primary key after ``checkpoint``.
+    """
+    subscribers = subscribers.order_by("pk").values_list("pk", "email")
+
+    while True:
+        if checkpoint is not None:
+            batch = list(subscribers.filter(pk__gt=checkpoint)[:batch_size])
+        else:
+            batch = list(subscribers[:batch_size])
+
+        if not batch:
+            break
+
+        yield batch
+
+        checkpoint = batch[-1][0]
+
+
+def iter_subscribers(subscribers, batch_size):
+    """
+    Yields ``(pk, email)`` of the subscribers, see ``iter_subscriber_batches``.
+    """
+    for batch in iter_subscriber_batches(subscribers, batch_size):
+        for row in batch:
+            yield row
+
+
+class Batcher(object):
+    def __init__(self, callback, size):
+        self.callback = callback
+        self.size = size
+        self.values = []
+
+    def add(self, value):
+        self.values.append(value)
+
+        if len(self.values) >= self.size:
+            self.flush()
+
+    def flush(self):
+        if self.values:
+            self.callback(self.values)
+
+            self.values = []
+
+
+class ContactListSync(object):
+    """
+    Uploads the subscribers of a newsletter list to the provider list.
+
+    Subscribers are streamed by primary key in batches, each batch is sent in
+    a single call (or a CSV import job when ``csv`` is set) and the last
+    primary key uploaded is stored in the cache, so an interrupted sync
+    resumes where it stopped.
+    """
+
+    def __init__(
+        self,
+        backend,
+        newsletter_list,
+        lang=None,
+        csv=False,
+        batch_size=None,
+        cache=None,
+    ):
+        self.backend = backend
+        self.newsletter_list = newsletter_list
+        self.lang = lang
+        self.csv = csv
+        self.batch_size = batch_size or (
+            SYNC_CSV_BATCH_SIZE if csv else MAILJET_CONTACTSLIST_LIMIT
+        )
+        self.cache = cache or caches[CACHE_ALIAS]
+        self.progress = SyncProgress(self.key, cache=self.cache)
+
+    @property
+    def key(self):
+        return "%s:%s" % (self.newsletter_list.pk, self.lang or "all")
+
+    @property
+    def checkpoint_key(self):
+        return self.progress.make_key("checkpoint")
+
+    def get_checkpoint(self):
+        return self.cache.get(self.checkpoint_key)
+
+    def set_checkpoint(self, pk):
+        self.cache.set(self.checkpoint_key, pk, None)
+
+    def reset(self):
+        self.cache.delete(self.checkpoint_key)
+
+    def get_subscribers(self):
+        subscribers = self.backend.get_list_subscribers(self.newsletter_list)
+
+        if self.lang:
+            subscribers = subscribers.filter(lang=self.lang)
+
+        return subscribers
+
+    def iter_batches(self, subscribers, checkpoint=None):
+        return iter_subscriber_batches(subscribers, self.batch_size, checkpoint)
+
+    def upload(self, emails):
+        if self.csv:
+            self.backend.import_contacts(self.newsletter_list.list_id, emails)
+        else:
+            self.backend.subscribe_many(self.newsletter_list.list_id, emails)
+
+    def run(self, restart=False):
+        if restart:
+            self.reset()
+
+        subscribers = self.get_subscribers()
+
+        checkpoint = self.get_checkpoint()
+
+        if checkpoint is None or self.progress.get() is None:
+            remaining = subscribers
+
+            if checkpoint is not None:
+                remaining = subscribers.filter(pk__gt=checkpoint)
+
+            self.progress.start(remaining.count())
+
+        processed = 0
+
+        for batch in self.iter_batches(subscribers, checkpoint):
+            self.upload([email for pk, email in batch])
+
+            self.set_checkpoint(batch[-1][0])
+            self.progress.update(processed=len(batch))
+
+            processed += len(batch)
+
+        self.progress.finish()
+        self.reset()
+
+        return processed
+
+
+class ContactListReconciliation(object):
+    """
+    Applies the differences between the local subscribers of a newsletter
+    list and the contacts of the provider list:
+
+    - contacts unsubscribed at the provider are unsubscribed locally
+    - local subscribers missing from the provider list are subscribed
+    - contacts subscribed at the provider without a local subscription are
+      unsubscribed from the provider list
+
+    Both sides are streamed and only kept as sorted arrays of email hashes.
+    """
+
+    def __init__(self, backend, newsletter_list, batch_size=None, dry_run=False):
+        self.backend = backend
+        self.newsletter_list = newsletter_list
+        self.batch_size = batch_size or MAILJET_CONTACTSLIST_LIMIT
+        self.dry_run = dry_run
+        self.stats = {"subscribed": 0, "unsubscribed": 0, "locally_unsubscribed": 0}
+
+    def get_subscribers(self):
+        return self.backend.get_list_subscribers(self.newsletter_list)
+
+    def iter_subscribers(self):
+        return iter_subscribers(self.get_subscribers(), self.batch_size)
+
+    def subscribe(self, emails):
+        self.stats["subscribed"] += len(emails)
+
+        if not self.dry_run:
+            self.backend.subscribe_many(self.newsletter_list.list_id, emails)
+
+    def unsubscribe(self, emails):
+        self.stats["unsubscribed"] += len(emails)
+
+        if not self.dry_run:
+            self.backend.unsubscribe_many(self.newsletter_list.list_id, emails)
+
+    def unsubscribe_locally(self, pks):
+        self.stats["locally_unsubscribed"] += len(pks)
+
+        if self.dry_run:
+            return
+
+        subscribers = self.get_subscribers().filter(pk__in=pks)
+
+        values = {"is_unsubscribed": True}
+
+        try:
+            subscribers.model._meta.get_field("unsubscribed_at")
+        except FieldDoesNotExist:
+            pass
+        else:
+            values["unsubscribed_at"] = datetime.now()
+
+        subscribers.update(**values)
+
+    def run(self):
+        local = sorted_array(hash_email(email) for pk, email in self.iter_subscribers())
+
+        remote = array("Q")
+        remote_unsubscribed = array("Q")
+
+        unsubscribe = Batcher(self.unsubscribe, self.batch_size)
+
+        for email, is_unsubscribed in self.backend.iter_list_contacts(
+            self.newsletter_list.list_id
+        ):
+            value = hash_email(email)
+
+            remote.append(value)
+
+            if is_unsubscribed:
+                remote_unsubscribed.append(value)
+            elif not array_contains(local, value):
+                unsubscribe.add(email)
+
+        unsubscribe.flush()
+
+        del local
+
+        remote = sorted_array(remote)
+        remote_unsubscribed = sorted_array(remote_unsubscribed)
+
+        subscribe = Batcher(self.subscribe, self.batch_size)
+        unsubscribe_locally = Batcher(self.unsubscribe_locally, self.batch_size)
+
+        for pk, email in self.iter_subscribers():
+            value = hash_email(email)
+
+            if array_contains(remote_unsubscribed, value):
+                unsubscribe_locally.add(pk)
+            elif not array_contains(remote, value):
+                subscribe.add(email)
+
+        subscribe.flush()
+        unsubscribe_locally.flush()
+
+        return self.stats
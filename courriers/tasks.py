@@ -1,3 +1,5 @@
+from celery import chord
+
 try:
     from celery.task import task
 except ImportError:
@@ -6,7 +8,7 @@ except ImportError:
 
 @task(bind=True)
 def subscribe(self, email, newsletter_list_id, user_id=None, **kwargs):
-    from courriers.backends import get_backend
+    from courriers.backends import get_backend_instance
     from courriers.models import NewsletterList
     from courriers import signals
 
@@ -14,7 +16,7 @@ def subscribe(self, email, newsletter_list_id, user_id=None, **kwargs):
 
     User = get_user_model()
 
-    backend = get_backend()()
+    backend = get_backend_instance()
 
     newsletter_list = None
 
@@ -40,7 +42,7 @@ def subscribe(self, email, newsletter_list_id, user_id=None, **kwargs):
 
 @task(bind=True)
 def unsubscribe(self, email, newsletter_list_id=None, user_id=None, **kwargs):
-    from courriers.backends import get_backend
+    from courriers.backends import get_backend_instance
     from courriers.models import NewsletterList
     from courriers import signals
 
@@ -66,7 +68,126 @@ def unsubscribe(self, email, newsletter_list_id=None, user_id=None, **kwargs):
                 sender=User, user=user, newsletter_list=newsletter_list
             )
     else:
-        backend = get_backend()()
+        backend = get_backend_instance()
+
+        backend.unsubscribe_all(
+            email, newsletter_lists.values_list("list_id", flat=True)
+        )
+
+
+def get_shards(subscribers, shard_size):
+    """
+    Returns ``(min_pk, max_pk)`` ranges of ``shard_size`` subscribers each,
+    the boundaries are the pks of the subscribers so sparse pks do not make
+    empty shards. The last range has no ``max_pk``.
+    """
+    pks = subscribers.order_by("pk").values_list("pk", flat=True)
+
+    min_pk = pks.first()
+
+    shards = []
+
+    while min_pk is not None:
+        max_pk = pks.filter(pk__gt=min_pk)[shard_size - 1 : shard_size].first()
+
+        shards.append((min_pk, max_pk))
+
+        min_pk = max_pk
+
+    return shards
+
+
+@task(bind=True)
+def send_newsletter(self, newsletter_id, **kwargs):
+    from courriers.backends import get_backend_instance
+    from courriers.models import Newsletter
+    from courriers.progress import SendProgress
+    from courriers.settings import DELIVERY_LEDGER, SEND_SHARD_SIZE
+
+    backend = get_backend_instance()
+
+    newsletter = Newsletter.objects.get(pk=newsletter_id)
+
+    progress = SendProgress(newsletter_id)
+
+    if not backend.shardable:
+        progress.start(1)
+
+        backend.send_mails(newsletter)
+
+        progress.update(processed=1)
+        progress.finish()
+
+        return
+
+    subscribers = backend.get_subscribers(newsletter)
+
+    if DELIVERY_LEDGER:
+        subscribers = backend.exclude_delivered(newsletter, subscribers)
+
+    progress.start(subscribers.count())
+
+    shards = get_shards(subscribers, SEND_SHARD_SIZE)
+
+    if not shards:
+        newsletter_sent.delay(None, newsletter_id)
+
+        return
+
+    chord(
+        send_newsletter_shard.s(newsletter_id, min_pk, max_pk)
+        for min_pk, max_pk in shards
+    )(newsletter_sent.s(newsletter_id))
+
+
+@task(bind=True)
+def send_newsletter_shard(self, newsletter_id, min_pk, max_pk, **kwargs):
+    from courriers.backends import get_backend_instance
+    from courriers.models import Newsletter
+    from courriers.progress import SendProgress
+
+    backend = get_backend_instance()
+
+    newsletter = Newsletter.objects.get(pk=newsletter_id)
+
+    subscribers = backend.get_subscribers(newsletter).filter(pk__gte=min_pk)
+
+    if max_pk is not None:
+        subscribers = subscribers.filter(pk__lt=max_pk)
+
+    return backend.deliver(
+        newsletter, subscribers=subscribers, progress=SendProgress(newsletter_id)
+    )
+
+
+@task(bind=True)
+def newsletter_sent(self, results, newsletter_id, **kwargs):
+    from courriers.models import Newsletter
+    from courriers.progress import SendProgress
+
+    Newsletter.objects.filter(pk=newsletter_id).update(sent=True)
+
+    SendProgress(newsletter_id).finish()
+
+
+@task(bind=True)
+def flush_operations(self, **kwargs):
+    from courriers.backends import get_backend_instance
+    from courriers.settings import OPERATIONS_FLUSH_LIMIT
+
+    backend = get_backend_instance()
+
+    return backend.flush_operations(limit=OPERATIONS_FLUSH_LIMIT)
+
+
+@task(bind=True)
+def sync_contacts_list(self, newsletter_list_id, lang=None, csv=False, **kwargs):
+    from courriers.backends import get_backend_instance
+    from courriers.models import NewsletterList
+    from courriers.sync import ContactListSync
+
+    backend = get_backend_instance()
+
+    newsletter_list = NewsletterList.objects.get(pk=newsletter_list_id)
 
-        for newsletter in newsletter_lists:
-            backend.unsubscribe(newsletter.list_id, email)
+    return ContactListSync(backend, newsletter_list, lang=lang, csv=csv).run()
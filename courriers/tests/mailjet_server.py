@@ -0,0 +1,350 @@
+import csv
+import io
+import json
+import random
+import threading
+import time
+
+from collections import OrderedDict, deque, namedtuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+Call = namedtuple("Call", ["method", "endpoint", "id", "params", "data", "status"])
+
+
+class MailjetHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def respond(self, status, payload=None):
+        body = json.dumps(payload if payload is not None else {}).encode("utf-8")
+
+        self.send_response(status)
+
+        if status == 429:
+            self.send_header("Retry-After", "1")
+
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def handle_method(self, method):
+        url = urlsplit(self.path)
+
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+
+        try:
+            data = json.loads(body.decode("utf-8")) if body else None
+        except ValueError:
+            data = body.decode("utf-8")
+
+        parts = [unquote(part) for part in url.path.split("/") if part]
+
+        if parts[:2] not in (["v3", "REST"], ["v3", "DATA"]) or len(parts) < 3:
+            return self.respond(404, {"ErrorMessage": "Not found"})
+
+        resource = parts[2]
+        id = parts[3] if len(parts) > 3 else None
+        action = parts[4] if len(parts) > 4 else None
+
+        endpoint = resource if action is None else "%s_%s" % (resource, action)
+        endpoint = endpoint.lower().replace("-", "")
+
+        params = dict(parse_qsl(url.query))
+
+        status, payload = self.server.dispatch(
+            self.client_address, method, endpoint, id, params, data
+        )
+
+        self.respond(status, payload)
+
+    def do_GET(self):
+        self.handle_method("GET")
+
+    def do_POST(self):
+        self.handle_method("POST")
+
+    def do_PUT(self):
+        self.handle_method("PUT")
+
+    def do_DELETE(self):
+        self.handle_method("DELETE")
+
+
+class MailjetServer(ThreadingHTTPServer):
+    """
+    A local stand-in for the Mailjet REST API, covering the endpoints used by
+    the Mailjet backend.
+
+    ``latency`` delays every response, ``error_rate`` answers a random share
+    of the calls with a 500, ``fail()`` queues errors for a given endpoint (a
+    ``None`` status lets the call through) and
+    ``rate_limit`` answers 429 (with a ``Retry-After`` header) once more than
+    that many calls were made in the last second. Every call is recorded in
+    ``calls``.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        latency=0,
+        error_rate=0,
+        rate_limit=None,
+        seed=None,
+    ):
+        ThreadingHTTPServer.__init__(self, (host, port), MailjetHandler)
+
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+
+        self.lock = threading.Lock()
+        self.random = random.Random(seed)
+        self.calls = []
+        self.connections = set()
+        self.failures = {}
+        self.campaigns = OrderedDict()
+        self.contacts = OrderedDict()
+        self.lists = {}
+        self.csv_data = {}
+        self.imports = OrderedDict()
+        self._window = deque()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    @property
+    def url(self):
+        return "http://%s:%d/" % self.server_address
+
+    def fail(self, endpoint, status=500, times=1):
+        with self.lock:
+            self.failures.setdefault(endpoint, deque()).extend([status] * times)
+
+    def calls_to(self, endpoint):
+        return [call for call in self.calls if call.endpoint == endpoint]
+
+    def add_contacts(self, list_id, emails, unsubscribed=False):
+        with self.lock:
+            for email in emails:
+                self._manage(list_id, email, unsubscribed)
+
+    def subscribers(self, list_id):
+        return [
+            email
+            for email, unsubscribed in self.lists.get(int(list_id), {}).items()
+            if not unsubscribed
+        ]
+
+    def _limited(self):
+        now = time.monotonic()
+
+        while self._window and self._window[0] <= now - 1:
+            self._window.popleft()
+
+        if len(self._window) >= self.rate_limit:
+            return True
+
+        self._window.append(now)
+
+        return False
+
+    def _error(self, endpoint):
+        failures = self.failures.get(endpoint)
+
+        if failures:
+            status = failures.popleft()
+
+            if status is not None:
+                return status
+
+        if self.rate_limit and self._limited():
+            return 429
+
+        if self.error_rate and self.random.random() < self.error_rate:
+            return 500
+
+        return None
+
+    def dispatch(self, client_address, method, endpoint, id, params, data):
+        if self.latency:
+            time.sleep(self.latency)
+
+        with self.lock:
+            self.connections.add(client_address)
+
+            status = self._error(endpoint)
+
+            if status is None:
+                handler = getattr(
+                    self, "%s_%s" % (method.lower(), endpoint), self.not_found
+                )
+
+                status, payload = handler(id, params, data)
+            else:
+                payload = {"StatusCode": status, "ErrorMessage": "Injected error"}
+
+            self.calls.append(Call(method, endpoint, id, params, data, status))
+
+        return status, payload
+
+    def not_found(self, id, params, data):
+        return 404, {"StatusCode": 404, "ErrorMessage": "Unknown resource"}
+
+    def _response(self, data, total=None):
+        return {
+            "Count": len(data),
+            "Data": data,
+            "Total": len(data) if total is None else total,
+        }
+
+    def _contact(self, email):
+        if email not in self.contacts:
+            self.contacts[email] = len(self.contacts) + 1
+
+        return self.contacts[email]
+
+    def _manage(self, list_id, email, unsubscribed):
+        self._contact(email)
+
+        self.lists.setdefault(int(list_id), OrderedDict())[email] = unsubscribed
+
+    def _page(self, rows, params):
+        offset = int(params.get("Offset", 0))
+        limit = int(params.get("Limit", 10))
+
+        if limit:
+            page = rows[offset : offset + limit]
+        else:
+            page = rows[offset:]
+
+        return 200, self._response(page, total=len(rows))
+
+    def post_campaigndraft(self, id, params, data):
+        campaign_id = len(self.campaigns) + 1
+
+        campaign = dict(data or {}, ID=campaign_id, Status=0)
+
+        self.campaigns[campaign_id] = campaign
+
+        return 201, self._response([campaign])
+
+    def post_campaigndraft_detailcontent(self, id, params, data):
+        campaign = self.campaigns.get(int(id))
+
+        if campaign is None:
+            return self.not_found(id, params, data)
+
+        campaign["Content"] = data
+
+        return 201, self._response([data])
+
+    def post_campaigndraft_send(self, id, params, data):
+        campaign = self.campaigns.get(int(id))
+
+        if campaign is None:
+            return self.not_found(id, params, data)
+
+        if campaign["Status"]:
+            return 400, {"StatusCode": 400, "ErrorMessage": "Already sent"}
+
+        campaign["Status"] = 1
+
+        return 201, self._response([{"Status": "Programmed"}])
+
+    def post_contactslist_managemanycontacts(self, id, params, data):
+        unsubscribed = data["Action"] in ("unsub", "remove")
+
+        for contact in data["Contacts"]:
+            self._manage(id, contact["Email"], unsubscribed)
+
+        return 201, self._response([{"JobID": len(self.calls) + 1}])
+
+    def post_contact_managecontactslists(self, id, params, data):
+        if id not in self.contacts:
+            return 404, {"StatusCode": 404, "ErrorMessage": "Object not found"}
+
+        for contacts_list in data["ContactsLists"]:
+            self._manage(
+                contacts_list["ListID"],
+                id,
+                contacts_list["Action"] in ("unsub", "remove"),
+            )
+
+        return 201, self._response([data])
+
+    def post_contactslist_csvdata(self, id, params, data):
+        data_id = len(self.csv_data) + 1
+
+        self.csv_data[data_id] = (int(id), data)
+
+        return 200, {"ID": data_id}
+
+    def post_csvimport(self, id, params, data):
+        list_id, content = self.csv_data[data["DataID"]]
+
+        unsubscribed = data["Method"] in ("unsub", "remove")
+
+        rows = list(csv.reader(io.StringIO(content)))
+
+        for row in rows[1:]:
+            self._manage(list_id, row[0], unsubscribed)
+
+        job_id = len(self.imports) + 1
+
+        self.imports[job_id] = dict(data, ID=job_id, Count=len(rows) - 1)
+
+        return 201, self._response([self.imports[job_id]])
+
+    def get_contact(self, id, params, data):
+        if "ContactsList" in params:
+            emails = self.lists.get(int(params["ContactsList"]), {}).keys()
+        else:
+            emails = self.contacts.keys()
+
+        rows = [{"ID": self.contacts[email], "Email": email} for email in emails]
+
+        return self._page(rows, params)
+
+    def get_listrecipient(self, id, params, data):
+        rows = []
+
+        for list_id, emails in self.lists.items():
+            if "ContactsList" in params and list_id != int(params["ContactsList"]):
+                continue
+
+            for email, unsubscribed in emails.items():
+                if "Unsub" in params and unsubscribed != (
+                    params["Unsub"].lower() == "true"
+                ):
+                    continue
+
+                rows.append(
+                    {
+                        "ContactID": self.contacts[email],
+                        "ContactEmail": email,
+                        "ListID": list_id,
+                        "IsUnsubscribed": unsubscribed,
+                    }
+                )
+
+        return self._page(rows, params)
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
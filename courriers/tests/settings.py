@@ -21,9 +21,11 @@ INSTALLED_APPS = [
 
 AUTH_USER_MODEL = "tests.User"
 
+COURRIERS_NEWSLETTERSUBSCRIBER_MODEL = "courriers.tests.models.NewsletterSubscriber"
+
 SECRET_KEY = "blabla"
 
-ROOT_URLCONF = "courriers.urls"
+ROOT_URLCONF = "courriers.tests.urls"
 
 try:
     from .temp import *  # noqa
@@ -0,0 +1,84 @@
+import socketserver
+import threading
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(("%s\r\n" % line).encode("ascii"))
+
+    def handle(self):
+        self.reply("220 localhost courriers sink")
+
+        recipients = []
+
+        while True:
+            line = self.rfile.readline()
+
+            if not line:
+                break
+
+            command = line.decode("ascii", "replace").strip().upper()
+
+            if command.startswith(("EHLO", "HELO")):
+                self.reply("250 localhost")
+            elif command.startswith("MAIL FROM"):
+                recipients = []
+                self.reply("250 OK")
+            elif command.startswith("RCPT TO"):
+                recipients.append(line.decode("ascii", "replace").strip()[8:])
+                self.reply("250 OK")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+
+                while self.rfile.readline() not in (b".\r\n", b".\n", b""):
+                    pass
+
+                self.server.record(self, recipients)
+                self.reply("250 OK")
+            elif command == "RSET":
+                recipients = []
+                self.reply("250 OK")
+            elif command == "NOOP":
+                self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                break
+            else:
+                self.reply("502 Command not implemented")
+
+
+class SMTPSink(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    """
+    A local SMTP server accepting every message, used to exercise real
+    SMTP connections in tests.
+    """
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, host="127.0.0.1", port=0):
+        socketserver.TCPServer.__init__(self, (host, port), SMTPHandler)
+
+        self.lock = threading.Lock()
+        self.messages = []
+        self.connections = set()
+
+    def record(self, handler, recipients):
+        with self.lock:
+            self.messages.append(recipients)
+            self.connections.add(handler.client_address)
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
@@ -1,21 +1,51 @@
 # -*- coding: utf-8 -*-
 import mock
+import time
 
-from django.test import TestCase
+from io import StringIO
+from unittest import skipIf
+
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from django.utils import timezone as datetime
 from django.core import mail
 
 from courriers.forms import SubscriptionForm, UnsubscribeForm
-from courriers.models import Newsletter, NewsletterList, NewsletterSegment
+from courriers.models import (
+    Newsletter,
+    NewsletterDelivery,
+    NewsletterItem,
+    NewsletterList,
+    NewsletterListOperation,
+    NewsletterSegment,
+)
 from courriers import settings
-from courriers.tasks import subscribe, unsubscribe
+from courriers.tasks import get_shards, send_newsletter, subscribe, unsubscribe
 
+from .mailjet_server import MailjetServer
 from .models import NewsletterSubscriber
 
+try:
+    import mailjet_rest
+except ImportError:
+    mailjet_rest = None
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
 User = get_user_model()
 
+processed = []
+
+
+def tracking_pre_processor(html):
+    processed.append(html)
+
+    return html.replace("<h1>", '<h1 class="title">')
+
 
 class BaseBackendTests(TestCase):
     def setUp(self):
@@ -177,6 +207,540 @@ class SimpleBackendTests(BaseBackendTests):
 
         self.assertEqual(len(mail.outbox) - out, 1)
 
+    def test_send_mails_in_chunks(self):
+        for i in range(5):
+            NewsletterSubscriber.objects.create(
+                newsletter_list=self.monthly, email="user%d@ulule.com" % i
+            )
+
+        from django.core.mail.backends.locmem import EmailBackend
+
+        from courriers.backends.delivery import ConnectionDelivery
+
+        with mock.patch.object(
+            EmailBackend,
+            "send_messages",
+            autospec=True,
+            side_effect=lambda c, m: len(m),
+        ), mock.patch.object(
+            ConnectionDelivery,
+            "send",
+            autospec=True,
+            side_effect=ConnectionDelivery.send,
+        ) as send:
+            results = self.backend.send_mails(
+                self.nl_monthly,
+                subscribers=NewsletterSubscriber.objects.filter(
+                    newsletter_list=self.monthly
+                ),
+                chunk_size=2,
+            )
+
+        self.assertEqual(results, 5)
+        self.assertEqual([len(call[0][1]) for call in send.call_args_list], [2, 2, 1])
+
+    def test_send_mails_renders_once_per_language(self):
+        for i in range(3):
+            NewsletterSubscriber.objects.create(
+                newsletter_list=self.monthly, email="user%d@ulule.com" % i, lang="fr"
+            )
+
+        from courriers import rendering
+
+        with mock.patch.object(
+            rendering, "render_to_string", wraps=rendering.render_to_string
+        ) as render_to_string:
+            self.backend.send_mails(
+                self.nl_monthly_fr,
+                subscribers=NewsletterSubscriber.objects.filter(
+                    newsletter_list=self.monthly
+                ),
+            )
+
+        self.assertEqual(render_to_string.call_count, 2)
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_renderer_fills_subscriber_values(self):
+        from courriers.rendering import (
+            NewsletterRenderer,
+            SUBSCRIBER_EMAIL_PLACEHOLDER,
+            UNSUBSCRIBE_URL_PLACEHOLDER,
+        )
+
+        renderer = NewsletterRenderer(self.nl_monthly)
+
+        subscriber = NewsletterSubscriber(email="a+b@ulule.com")
+
+        with mock.patch.object(
+            renderer,
+            "get_body",
+            return_value="<%s|%s>"
+            % (SUBSCRIBER_EMAIL_PLACEHOLDER, UNSUBSCRIBE_URL_PLACEHOLDER),
+        ):
+            body = renderer.render("courriers/newsletter_raw_detail.html", subscriber)
+
+        self.assertEqual(
+            body,
+            "<a+b@ulule.com|https://example.com%s?email=a%%2Bb%%40ulule.com>"
+            % reverse("newsletter_list_unsubscribe", args=[self.monthly.slug]),
+        )
+
+        renderer = NewsletterRenderer(self.nl_monthly)
+
+        with mock.patch(
+            "courriers.rendering.SITE_URL", "http://newsletters.ulule.com/"
+        ), mock.patch.object(
+            renderer, "get_body", return_value=UNSUBSCRIBE_URL_PLACEHOLDER
+        ):
+            body = renderer.render("courriers/newsletter_raw_detail.html", subscriber)
+
+        self.assertEqual(
+            body,
+            "http://newsletters.ulule.com%s?email=a%%2Bb%%40ulule.com"
+            % reverse("newsletter_list_unsubscribe", args=[self.monthly.slug]),
+        )
+
+    @mock.patch.object(
+        settings, "PRE_PROCESSORS", ("courriers.tests.tests.tracking_pre_processor",)
+    )
+    def test_send_mails_pre_processes_once_per_language(self):
+        for i in range(3):
+            NewsletterSubscriber.objects.create(
+                newsletter_list=self.monthly, email="user%d@ulule.com" % i, lang="fr"
+            )
+
+        del processed[:]
+
+        for i in range(2):
+            self.backend.send_mails(
+                self.nl_monthly_fr,
+                subscribers=NewsletterSubscriber.objects.filter(
+                    newsletter_list=self.monthly
+                ),
+            )
+
+            self.nl_monthly_fr.deliveries.all().delete()
+
+        self.assertEqual(len(processed), 1)
+        self.assertEqual(len(mail.outbox), 6)
+
+        for message in mail.outbox:
+            self.assertIn('<h1 class="title">', message.alternatives[0][0])
+
+    def test_send_mails_with_connection_pool(self):
+        from .smtp_server import SMTPSink
+
+        for i in range(10):
+            NewsletterSubscriber.objects.create(
+                newsletter_list=self.monthly, email="user%d@ulule.com" % i
+            )
+
+        with SMTPSink() as sink:
+            with override_settings(
+                EMAIL_BACKEND="django.core.mail.backends.smtp.EmailBackend",
+                EMAIL_HOST=sink.server_address[0],
+                EMAIL_PORT=sink.port,
+            ):
+                results = self.backend.send_mails(
+                    self.nl_monthly,
+                    subscribers=NewsletterSubscriber.objects.filter(
+                        newsletter_list=self.monthly
+                    ),
+                    chunk_size=2,
+                    pool_size=3,
+                )
+
+        self.assertEqual(results, 10)
+        self.assertEqual(len(sink.messages), 10)
+        self.assertEqual(len(sink.connections), 3)
+
+    def test_send_mails_with_connection_pool_propagates_errors(self):
+        NewsletterSubscriber.objects.create(
+            newsletter_list=self.monthly, email="adele@ulule.com"
+        )
+
+        from django.core.mail.backends.locmem import EmailBackend
+
+        with mock.patch.object(
+            EmailBackend, "send_messages", side_effect=IOError("Relay down")
+        ):
+            with self.assertRaises(IOError):
+                self.backend.send_mails(
+                    self.nl_monthly,
+                    subscribers=NewsletterSubscriber.objects.filter(
+                        newsletter_list=self.monthly
+                    ),
+                    pool_size=2,
+                )
+
+        self.assertFalse(Newsletter.objects.get(pk=self.nl_monthly.pk).sent)
+
+    def test_reconcile_contacts_lists_command(self):
+        from django.core.management import CommandError, call_command
+
+        NewsletterList.objects.filter(pk=self.monthly.pk).update(list_id=1)
+
+        with self.assertRaisesMessage(
+            CommandError, "SimpleBackend cannot list the contacts of its lists"
+        ):
+            call_command("reconcile_contacts_lists", stdout=StringIO())
+
+    def test_send_mails_with_connection_pool_without_connection(self):
+        for i in range(10):
+            NewsletterSubscriber.objects.create(
+                newsletter_list=self.monthly, email="user%d@ulule.com" % i
+            )
+
+        with mock.patch(
+            "django.core.mail.get_connection", side_effect=ValueError("No backend")
+        ):
+            with self.assertRaises(ValueError):
+                self.backend.send_mails(
+                    self.nl_monthly,
+                    subscribers=NewsletterSubscriber.objects.filter(
+                        newsletter_list=self.monthly
+                    ),
+                    chunk_size=1,
+                    pool_size=2,
+                )
+
+        self.assertFalse(Newsletter.objects.get(pk=self.nl_monthly.pk).sent)
+
+    def test_pooled_delivery_detects_dead_workers(self):
+        from courriers.backends.delivery import PooledDelivery
+
+        with mock.patch.object(
+            PooledDelivery, "_serve", side_effect=ValueError("Worker down")
+        ):
+            delivery = PooledDelivery(2, queue_size=1)
+
+            with self.assertRaises(RuntimeError):
+                for i in range(5):
+                    delivery.send([mock.Mock()], tag=[(i, "user@ulule.com")])
+
+            with self.assertRaises(RuntimeError):
+                delivery.close()
+
+    @mock.patch.object(settings, "SEND_SHARD_SIZE", 3)
+    def test_send_newsletter_task(self):
+        for i in range(7):
+            NewsletterSubscriber.objects.create(
+                newsletter_list=self.monthly, email="user%d@ulule.com" % i
+            )
+
+        subscribers = NewsletterSubscriber.objects.filter(newsletter_list=self.monthly)
+
+        self.assertEqual(len(get_shards(subscribers, 3)), 3)
+
+        pks = list(subscribers.order_by("pk").values_list("pk", flat=True))
+
+        # Sparse pks only make shards for the subscribers left
+        sparse = subscribers.exclude(pk__in=pks[1:6])
+
+        self.assertEqual(get_shards(sparse, 3), [(pks[0], None)])
+        self.assertEqual(get_shards(sparse, 1), [(pks[0], pks[6]), (pks[6], None)])
+        self.assertEqual(get_shards(subscribers.none(), 3), [])
+
+        with mock.patch(
+            "courriers.backends.simple.SimpleBackend.exclude_delivered"
+        ) as exclude_delivered:
+            send_newsletter.delay(self.nl_monthly.pk)
+
+        self.assertFalse(exclude_delivered.called)
+
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            sorted(subscribers.values_list("email", flat=True)),
+        )
+        self.assertTrue(Newsletter.objects.get(pk=self.nl_monthly.pk).sent)
+
+    @mock.patch("courriers.backends.simple.DELIVERY_LEDGER", True)
+    def test_send_mails_resumes_from_ledger(self):
+        for i in range(5):
+            NewsletterSubscriber.objects.create(
+                newsletter_list=self.monthly, email="user%d@ulule.com" % i
+            )
+
+        from django.core.mail.backends.locmem import EmailBackend
+
+        send_messages = EmailBackend.send_messages
+
+        def flaky_send_messages(connection, messages):
+            if "user2@ulule.com" in messages[0].to:
+                raise IOError("Relay down")
+
+            return send_messages(connection, messages)
+
+        subscribers = NewsletterSubscriber.objects.filter(newsletter_list=self.monthly)
+
+        with mock.patch.object(
+            EmailBackend,
+            "send_messages",
+            autospec=True,
+            side_effect=flaky_send_messages,
+        ):
+            with self.assertRaises(IOError):
+                self.backend.send_mails(
+                    self.nl_monthly, subscribers=subscribers, chunk_size=2
+                )
+
+        self.assertEqual(len(mail.outbox), 2)
+
+        deliveries = NewsletterDelivery.objects.filter(newsletter=self.nl_monthly)
+
+        self.assertEqual(
+            deliveries.filter(status=NewsletterDelivery.STATUS_SENT).count(), 2
+        )
+        self.assertEqual(
+            deliveries.filter(status=NewsletterDelivery.STATUS_FAILED).count(), 2
+        )
+
+        self.assertEqual(
+            self.backend.send_mails(self.nl_monthly, subscribers=subscribers), 3
+        )
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            sorted(subscribers.values_list("email", flat=True)),
+        )
+        self.assertEqual(
+            deliveries.filter(status=NewsletterDelivery.STATUS_SENT).count(), 5
+        )
+        self.assertEqual(deliveries.filter(attempt=2).count(), 2)
+
+        # The ledger is keyed by email, not by the pk of the recipients
+        other = NewsletterSubscriber(pk=subscribers[0].pk, email="other@ulule.com")
+
+        self.assertEqual(
+            list(self.backend.exclude_delivered(self.nl_monthly, [other])), [other]
+        )
+
+    @mock.patch("courriers.backends.simple.DELIVERY_LEDGER", True)
+    def test_send_mails_records_each_recipient(self):
+        for i in range(3):
+            NewsletterSubscriber.objects.create(
+                newsletter_list=self.monthly, email="user%d@ulule.com" % i
+            )
+
+        from django.core.mail.backends.locmem import EmailBackend
+
+        with mock.patch.object(
+            EmailBackend,
+            "send_messages",
+            autospec=True,
+            side_effect=lambda c, m: 0 if "user1@ulule.com" in m[0].to else 1,
+        ):
+            sent = self.backend.send_mails(
+                self.nl_monthly,
+                fail_silently=True,
+                subscribers=NewsletterSubscriber.objects.filter(
+                    newsletter_list=self.monthly
+                ),
+            )
+
+        self.assertEqual(sent, 2)
+        self.assertEqual(
+            dict(
+                NewsletterDelivery.objects.filter(
+                    newsletter=self.nl_monthly
+                ).values_list("email", "status")
+            ),
+            {
+                "user0@ulule.com": NewsletterDelivery.STATUS_SENT,
+                "user1@ulule.com": NewsletterDelivery.STATUS_FAILED,
+                "user2@ulule.com": NewsletterDelivery.STATUS_SENT,
+            },
+        )
+
+    def test_delivery_ledger_records_shared_emails(self):
+        # Another shard already recorded the email for its subscriber
+        NewsletterDelivery.objects.record(
+            self.nl_monthly,
+            [(1, "a@ulule.com"), (2, "b@ulule.com")],
+            NewsletterDelivery.STATUS_SENT,
+        )
+        NewsletterDelivery.objects.record(
+            self.nl_monthly,
+            [(3, "a@ulule.com"), (4, "c@ulule.com")],
+            NewsletterDelivery.STATUS_FAILED,
+        )
+
+        self.assertEqual(
+            list(
+                NewsletterDelivery.objects.filter(newsletter=self.nl_monthly)
+                .order_by("email")
+                .values_list("email", "subscriber_id", "status", "attempt")
+            ),
+            [
+                ("a@ulule.com", 3, NewsletterDelivery.STATUS_FAILED, 2),
+                ("b@ulule.com", 2, NewsletterDelivery.STATUS_SENT, 1),
+                ("c@ulule.com", 4, NewsletterDelivery.STATUS_FAILED, 1),
+            ],
+        )
+
+    def test_get_subscribers(self):
+        NewsletterSubscriber.objects.create(
+            newsletter_list=self.monthly, email="fr@ulule.com", lang="fr"
+        )
+        NewsletterSubscriber.objects.create(
+            newsletter_list=self.monthly, email="en@ulule.com", lang="en-us"
+        )
+        NewsletterSubscriber.objects.create(
+            newsletter_list=self.monthly,
+            email="unsubscribed@ulule.com",
+            lang="fr",
+            is_unsubscribed=True,
+        )
+        NewsletterSubscriber.objects.create(
+            newsletter_list=self.weekly, email="weekly@ulule.com", lang="fr"
+        )
+
+        subscribers = self.backend.get_subscribers(self.nl_monthly_fr)
+
+        self.assertEqual(
+            list(subscribers.values_list("email", flat=True)), ["fr@ulule.com"]
+        )
+        self.assertEqual(subscribers.query.deferred_loading, ({"email", "lang"}, False))
+
+        self.assertEqual(self.backend.send_mails(self.nl_monthly), 2)
+
+    def test_send_mails_groups_subscribers_by_language(self):
+        for i, lang in enumerate(("fr", "en-us", "fr", None, "en-us", "fr")):
+            NewsletterSubscriber.objects.create(
+                newsletter_list=self.monthly, email="user%d@ulule.com" % i, lang=lang
+            )
+
+        self.assertEqual(
+            self.backend.get_send_plan(self.nl_monthly),
+            {"fr": 3, "en-us": 2, None: 1},
+        )
+
+        with mock.patch("courriers.backends.simple.translation.activate") as activate:
+            self.backend.send_mails(self.nl_monthly)
+
+        self.assertEqual(len(mail.outbox), 6)
+        self.assertEqual(
+            set(call[0][0] for call in activate.call_args_list[:3]),
+            {None, "en-us", "fr"},
+        )
+        self.assertEqual(activate.call_count, 4)
+
+    @mock.patch.object(settings, "THROTTLE_RATE", 1000)
+    def test_send_mails_throttled(self):
+        from courriers.throttling import TokenBucket
+
+        for i in range(3):
+            NewsletterSubscriber.objects.create(
+                newsletter_list=self.monthly, email="user%d@ulule.com" % i
+            )
+
+        with mock.patch.object(
+            TokenBucket, "acquire", autospec=True, return_value=None
+        ) as acquire:
+            self.assertEqual(self.backend.send_mails(self.nl_monthly), 3)
+
+        self.assertEqual(acquire.call_count, 3)
+
+
+class InliningTests(TestCase):
+    html = """<html><head><style type="text/css">
+        /* Layout */
+        h1, .title { color: red; font-size: 20px }
+        #main p.lead { color: blue !important }
+        td > a { text-decoration: none }
+        a:hover { color: green }
+        @media (max-width: 600px) { h1 { font-size: 14px } }
+    </style></head>
+    <body>
+        <!-- Header -->
+        <div id="main">
+            <h1 class="title" style="color: black">Hello   &amp; welcome</h1>
+            <p class="lead" style="color: black">Intro</p>
+            <table><tr><td><a href="/?a=1&amp;b=2" class="">Link</a></td></tr></table>
+            <pre>  keep   this  </pre>
+        </div>
+    </body></html>"""
+
+    def test_inline_css(self):
+        from courriers.inlining import compile_stylesheet, inline_css
+
+        compile_stylesheet.cache_clear()
+
+        html = inline_css(self.html)
+
+        self.assertEqual(
+            html,
+            "<html><head><style>a:hover{color:green}"
+            "@media (max-width: 600px){h1{font-size: 14px}}</style></head> "
+            '<body> <div id="main"> '
+            '<h1 class="title" style="font-size:20px;color:black">'
+            "Hello &amp; welcome</h1> "
+            '<p class="lead" style="color:blue">Intro</p> '
+            '<table><tr><td><a href="/?a=1&amp;b=2" style="text-decoration:none">'
+            "Link</a></td></tr></table> "
+            "<pre>  keep   this  </pre> </div> </body></html>",
+        )
+
+        inline_css(self.html)
+
+        self.assertEqual(compile_stylesheet.cache_info().misses, 1)
+        self.assertEqual(compile_stylesheet.cache_info().hits, 1)
+
+    def test_benchmark_command(self):
+        from django.core.management import call_command
+
+        stdout = StringIO()
+
+        call_command("benchmark_pre_processors", iterations=2, stdout=stdout)
+
+        self.assertIn("courriers.inlining.inline_css: ", stdout.getvalue())
+        self.assertIn("ms per message", stdout.getvalue())
+
+
+class ThrottlingTests(TestCase):
+    def test_token_bucket(self):
+        from courriers.throttling import TokenBucket
+
+        clock = mock.Mock(return_value=100.0)
+
+        bucket = TokenBucket(2, burst=2, clock=clock)
+
+        self.assertEqual([bucket.consume() for i in range(4)], [0, 0, 0.5, 1.0])
+
+        clock.return_value = 101.0
+
+        self.assertEqual(bucket.consume(), 0.5)
+
+    def test_cache_token_bucket(self):
+        from django.core.cache import caches
+        from courriers.throttling import CacheTokenBucket
+
+        caches["default"].clear()
+
+        clock = mock.Mock(return_value=100.75)
+        sleep = mock.Mock()
+
+        buckets = [
+            CacheTokenBucket(
+                2, burst=3, cache=caches["default"], clock=clock, sleep=sleep
+            )
+            for i in range(2)
+        ]
+
+        # The burst is shared by every bucket
+        self.assertEqual(
+            [bucket.consume() for bucket in buckets + buckets[:1]], [0, 0, 0]
+        )
+        self.assertEqual(buckets[1].consume(), 0.5)
+
+        # Crossing a second does not refill the bucket at once
+        clock.return_value = 101.25
+
+        self.assertEqual(buckets[0].consume(), 0.5)
+
+        buckets[1].acquire()
+
+        sleep.assert_called_once_with(1.0)
+
 
 class NewslettersViewsTests(TestCase):
     def setUp(self):
@@ -214,6 +778,153 @@ class NewslettersViewsTests(TestCase):
 
         self.assertTemplateUsed(response, "courriers/newsletter_detail.html")
 
+    @mock.patch.object(settings, "PAGE_CACHE_TIMEOUT", 60)
+    def test_page_cache(self):
+        from django.core.cache import cache
+
+        from courriers.caching import get_timeout
+
+        cache.clear()
+
+        segment = NewsletterSegment.objects.create(
+            name="monthly en", segment_id=4, newsletter_list=self.monthly, lang="en-us"
+        )
+        n2 = Newsletter.objects.create(
+            name="Newsletter2",
+            newsletter_list=self.monthly,
+            newsletter_segment=segment,
+            published_at=datetime.now() - datetime.timedelta(hours=1),
+            status=Newsletter.STATUS_ONLINE,
+        )
+
+        url = self.monthly.get_absolute_url()
+
+        response = self.client.get(url)
+
+        self.assertEqual(list(response.context["newsletters"]), [n2])
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+
+        self.assertEqual(list(response.context["newsletters"]), [n2])
+        self.assertEqual(response.context["newsletter_list"], self.monthly)
+
+        self.client.get(n2.get_absolute_url())
+
+        with self.assertNumQueries(0):
+            response = self.client.get(n2.get_absolute_url())
+
+        self.assertEqual(response.context["newsletter"], n2)
+
+        n2.name = "Newsletter2 renamed"
+        n2.save()
+
+        response = self.client.get(url)
+
+        self.assertEqual(
+            [newsletter.name for newsletter in response.context["newsletters"]],
+            ["Newsletter2 renamed"],
+        )
+
+        self.assertEqual(get_timeout(self.monthly.pk), 60)
+
+        Newsletter.objects.create(
+            name="Newsletter3",
+            newsletter_list=self.monthly,
+            newsletter_segment=segment,
+            published_at=datetime.now() + datetime.timedelta(seconds=30),
+            status=Newsletter.STATUS_ONLINE,
+        )
+
+        self.assertLessEqual(get_timeout(self.monthly.pk), 30)
+
+    def test_keyset_pagination(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        from courriers.views import NewsletterListView
+
+        segment = NewsletterSegment.objects.create(
+            name="monthly en", segment_id=4, newsletter_list=self.monthly, lang="en-us"
+        )
+
+        published_at = datetime.now() - datetime.timedelta(days=1)
+
+        newsletters = [
+            Newsletter.objects.create(
+                name="Newsletter%d" % i,
+                newsletter_list=self.monthly,
+                newsletter_segment=segment,
+                published_at=published_at - datetime.timedelta(hours=i // 2),
+                status=Newsletter.STATUS_ONLINE,
+            )
+            for i in range(5)
+        ]
+
+        newsletters.sort(key=lambda n: (n.published_at, n.pk), reverse=True)
+
+        url = self.monthly.get_absolute_url()
+
+        with mock.patch.multiple(
+            NewsletterListView, keyset_pagination=True, paginate_by=2
+        ):
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(url)
+
+            self.assertFalse(
+                any("COUNT(" in query["sql"] for query in context.captured_queries)
+            )
+
+            page = response.context["page_obj"]
+
+            self.assertEqual(list(response.context["newsletters"]), newsletters[:2])
+            self.assertTrue(page.has_next())
+            self.assertFalse(page.has_previous())
+
+            response = self.client.get(url, {"cursor": page.next_cursor})
+            page = response.context["page_obj"]
+
+            self.assertEqual(page.number, 2)
+            self.assertEqual(list(page), newsletters[2:4])
+
+            response = self.client.get(url, {"cursor": page.previous_cursor})
+
+            self.assertEqual(list(response.context["page_obj"]), newsletters[:2])
+
+            response = self.client.get(url, {"cursor": page.next_cursor})
+            page = response.context["page_obj"]
+
+            self.assertEqual(list(page), newsletters[4:])
+            self.assertFalse(page.has_next())
+            self.assertEqual(page.previous_page_number(), 2)
+
+            response = self.client.get(url, {"page": 3})
+            page = response.context["page_obj"]
+
+            self.assertEqual(page.number, 3)
+            self.assertEqual(list(page), newsletters[4:])
+            self.assertEqual(page.previous_page_number(), 2)
+
+            response = self.client.get(
+                reverse(
+                    "newsletter_list",
+                    kwargs={"slug": self.monthly.slug, "lang": "en", "page": 2},
+                )
+            )
+            page = response.context["page_obj"]
+
+            self.assertEqual(page.number, 2)
+            self.assertEqual(list(page), newsletters[2:4])
+            self.assertTrue(page.has_next())
+
+            response = self.client.get(url, {"page": 4})
+
+            self.assertEqual(response.status_code, 404)
+
+            response = self.client.get(url, {"cursor": "n.2.invalid.1"})
+
+            self.assertEqual(response.status_code, 404)
+
     def test_newsletter_list_subscribe_view(self):
         response = self.client.get(
             reverse("newsletter_list_subscribe", kwargs={"slug": self.monthly.slug})
@@ -317,6 +1028,59 @@ class NewslettersViewsTests(TestCase):
         self.assertTemplateUsed(response, "courriers/newsletter_raw_detail.html")
 
 
+class NewsletterAdminTests(TestCase):
+    def setUp(self):
+        self.monthly = NewsletterList.objects.create(
+            name="TestMonthly", slug="testmonthly"
+        )
+        self.segment_monthly = NewsletterSegment.objects.create(
+            name="monthly", segment_id=3, newsletter_list=self.monthly
+        )
+        self.newsletter = Newsletter.objects.create(
+            name="Newsletter1",
+            newsletter_list=self.monthly,
+            newsletter_segment=self.segment_monthly,
+            published_at=datetime.now() - datetime.timedelta(hours=1),
+            status=Newsletter.STATUS_ONLINE,
+        )
+
+        for i in range(3):
+            NewsletterSubscriber.objects.create(
+                newsletter_list=self.monthly, email="user%d@ulule.com" % i
+            )
+
+        User.objects.create_superuser("admin", "admin@ulule.com", "secret")
+
+        self.client.login(username="admin", password="secret")
+
+    def test_send_newsletter(self):
+        response = self.client.get(
+            reverse("admin:send_newsletter", args=[self.newsletter.pk])
+        )
+
+        progress_url = reverse(
+            "admin:send_newsletter_progress", args=[self.newsletter.pk]
+        )
+
+        self.assertRedirects(response, progress_url)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertTrue(Newsletter.objects.get(pk=self.newsletter.pk).sent)
+
+        response = self.client.get(progress_url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(
+            response, "admin/courriers/newsletter/send_progress.html"
+        )
+
+        progress = self.client.get(progress_url, {"format": "json"}).json()["progress"]
+
+        self.assertEqual(progress["total"], 3)
+        self.assertEqual(progress["processed"], 3)
+        self.assertEqual(progress["errors"], 0)
+        self.assertTrue(progress["finished"])
+
+
 class SubscribeFormTest(TestCase):
     def setUp(self):
         from courriers.backends import get_backend
@@ -331,6 +1095,29 @@ class SubscribeFormTest(TestCase):
             name="monthly fr", segment_id=3, newsletter_list=self.monthly, lang="fr"
         )
 
+    def test_backend_registry(self):
+        from courriers.backends import get_backend_instance, reset_backends
+
+        reset_backends()
+
+        self.addCleanup(reset_backends)
+
+        with mock.patch("courriers.backends.simple.SimpleBackend.__init__") as init:
+            init.return_value = None
+
+            form = SubscriptionForm(newsletter_list=self.monthly)
+
+            self.assertFalse(init.called)
+
+            self.assertIs(form.backend, get_backend_instance())
+            self.assertIs(form.backend, UnsubscribeForm().backend)
+            self.assertEqual(init.call_count, 1)
+
+            reset_backends()
+
+            self.assertIsNot(form.backend, get_backend_instance())
+            self.assertEqual(init.call_count, 2)
+
     def test_subscription_logged_in(self):
         self.client.login(username="thoas", password="secret")
 
@@ -509,6 +1296,577 @@ if hasattr(settings, "COURRIERS_MAILJET_API_KEY") and hasattr(
                 self.backend.send_mails(newsletter)
 
 
+@skipIf(mailjet_rest is None, "mailjet_rest is not installed")
+@mock.patch.multiple(
+    "courriers.backends.mailjet_rest",
+    MAILJET_API_KEY="key",
+    MAILJET_API_SECRET_KEY="secret",
+)
+class MailjetRESTBackendTests(TestCase):
+    def setUp(self):
+        from courriers.backends.mailjet_rest import reset_client
+
+        reset_client()
+
+        self.addCleanup(reset_client)
+
+    def serve(self, **kwargs):
+        from courriers.backends.mailjet_rest import MailjetRESTBackend
+
+        server = MailjetServer(**kwargs).__enter__()
+
+        self.addCleanup(server.__exit__)
+
+        for patcher in (
+            mock.patch.multiple(
+                "courriers.backends.mailjet_rest",
+                MAILJET_API_URL=server.url,
+                MAILJET_BACKOFF_FACTOR=0,
+            ),
+            mock.patch("courriers.backends.mailjet_utils.DEFAULT_FROM_NAME", "Ulule"),
+        ):
+            patcher.start()
+
+            self.addCleanup(patcher.stop)
+
+        return server, MailjetRESTBackend()
+
+    def test_client_is_shared(self):
+        from courriers.backends.mailjet_rest import MailjetRESTBackend
+
+        backend = MailjetRESTBackend()
+
+        self.assertIs(backend.client, MailjetRESTBackend().client)
+
+        adapter = backend.client.session.get_adapter(settings.MAILJET_API_URL)
+
+        self.assertEqual(adapter.max_retries.total, settings.MAILJET_MAX_RETRIES)
+        self.assertIn(429, adapter.max_retries.status_forcelist)
+        self.assertEqual(adapter._pool_maxsize, settings.MAILJET_POOL_SIZE)
+
+    @mock.patch("courriers.backends.campaign.DEFAULT_FROM_NAME", "Ulule")
+    def test_send_campaign(self):
+        server, backend = self.serve()
+
+        newsletter_list = NewsletterList.objects.create(
+            name="TestMonthly", slug="testmonthly", list_id=1
+        )
+        newsletter = Newsletter.objects.create(
+            name="Newsletter",
+            published_at=datetime.now(),
+            status=Newsletter.STATUS_ONLINE,
+            newsletter_list=newsletter_list,
+            newsletter_segment=NewsletterSegment.objects.create(
+                name="monthly", segment_id=3, newsletter_list=newsletter_list
+            ),
+        )
+
+        backend.send_mails(newsletter)
+
+        self.assertEqual(
+            [call.endpoint for call in server.calls],
+            [
+                "campaigndraft",
+                "campaigndraft_detailcontent",
+                "campaigndraft_send",
+            ],
+        )
+        self.assertEqual(server.campaigns[1]["ContactsListID"], 1)
+        self.assertEqual(server.campaigns[1]["SegmentationID"], 3)
+        self.assertEqual(server.campaigns[1]["Status"], 1)
+        self.assertTrue(Newsletter.objects.get(pk=newsletter.pk).sent)
+
+    @mock.patch("courriers.backends.campaign.DEFAULT_FROM_NAME", "Ulule")
+    def test_resume_campaign(self):
+        server, backend = self.serve()
+
+        newsletter_list = NewsletterList.objects.create(
+            name="TestMonthly", slug="testmonthly", list_id=1
+        )
+        newsletter = Newsletter.objects.create(
+            name="Newsletter",
+            published_at=datetime.now(),
+            status=Newsletter.STATUS_ONLINE,
+            newsletter_list=newsletter_list,
+            newsletter_segment=NewsletterSegment.objects.create(
+                name="monthly", segment_id=3, newsletter_list=newsletter_list
+            ),
+        )
+
+        server.fail("campaigndraft_send", status=500)
+
+        with mock.patch("courriers.backends.campaign.FAIL_SILENTLY", True):
+            backend.send_mails(newsletter)
+
+        newsletter = Newsletter.objects.get(pk=newsletter.pk)
+
+        self.assertFalse(newsletter.sent)
+        self.assertEqual(newsletter.campaign_id, 1)
+        self.assertEqual(newsletter.campaign_step, Newsletter.CAMPAIGN_STEP_CONTENT)
+
+        backend.send_mails(newsletter)
+        backend.send_mails(newsletter)
+
+        self.assertTrue(Newsletter.objects.get(pk=newsletter.pk).sent)
+        self.assertEqual(len(server.campaigns), 1)
+        self.assertEqual(len(server.calls_to("campaigndraft")), 1)
+        self.assertEqual(len(server.calls_to("campaigndraft_detailcontent")), 1)
+        self.assertEqual(
+            [call.status for call in server.calls_to("campaigndraft_send")], [500, 201]
+        )
+
+    def test_sync_contacts_list(self):
+        from django.core.cache import cache
+
+        from courriers.sync import ContactListSync
+
+        cache.clear()
+
+        server, backend = self.serve()
+
+        newsletter_list = NewsletterList.objects.create(
+            name="TestMonthly", slug="testmonthly", list_id=1
+        )
+
+        emails = ["%d@ulule.com" % i for i in range(7)]
+
+        for email in emails:
+            NewsletterSubscriber.objects.create(
+                newsletter_list=newsletter_list, email=email, lang="fr"
+            )
+
+        NewsletterSubscriber.objects.create(
+            newsletter_list=newsletter_list, email="en@ulule.com", lang="en"
+        )
+        NewsletterSubscriber.objects.create(
+            newsletter_list=newsletter_list,
+            email="unsubscribed@ulule.com",
+            lang="fr",
+            is_unsubscribed=True,
+        )
+
+        sync = ContactListSync(backend, newsletter_list, lang="fr", batch_size=3)
+
+        # The third batch fails once the first two were uploaded
+        server.fail("contactslist_managemanycontacts", status=None, times=2)
+        server.fail("contactslist_managemanycontacts", status=400)
+
+        with self.assertRaises(Exception):
+            sync.run()
+
+        self.assertEqual(
+            sync.get_checkpoint(),
+            NewsletterSubscriber.objects.get(email="5@ulule.com").pk,
+        )
+        self.assertEqual(sync.progress.get()["processed"], 6)
+
+        self.assertEqual(sync.run(), 1)
+
+        self.assertEqual(server.subscribers(1), emails)
+        self.assertEqual(
+            [(call.status, len(call.data["Contacts"])) for call in server.calls],
+            [(201, 3), (201, 3), (400, 1), (201, 1)],
+        )
+        self.assertIsNone(sync.get_checkpoint())
+        self.assertTrue(sync.progress.get()["finished"])
+        self.assertEqual(sync.progress.get()["processed"], 7)
+
+        ContactListSync(backend, newsletter_list, csv=True).run()
+
+        self.assertEqual(len(server.imports), 1)
+        self.assertEqual(server.imports[1]["Count"], 8)
+        self.assertEqual(
+            sorted(server.subscribers(1)), sorted(emails + ["en@ulule.com"])
+        )
+
+    def test_reconcile_contacts_list(self):
+        from courriers.sync import ContactListReconciliation
+
+        server, backend = self.serve()
+
+        newsletter_list = NewsletterList.objects.create(
+            name="TestMonthly", slug="testmonthly", list_id=1
+        )
+
+        for email in ("synced@ulule.com", "local@ulule.com", "bounced@ulule.com"):
+            NewsletterSubscriber.objects.create(
+                newsletter_list=newsletter_list, email=email
+            )
+
+        NewsletterSubscriber.objects.create(
+            newsletter_list=newsletter_list,
+            email="left@ulule.com",
+            is_unsubscribed=True,
+        )
+
+        server.add_contacts(
+            1, ["Synced@ulule.com", "left@ulule.com", "remote@ulule.com"]
+        )
+        server.add_contacts(1, ["bounced@ulule.com"], unsubscribed=True)
+
+        with mock.patch(
+            "courriers.backends.mailjet_rest.MAILJET_CONTACTFILTER_LIMIT", 2
+        ):
+            stats = ContactListReconciliation(
+                backend, newsletter_list, batch_size=1
+            ).run()
+
+        self.assertEqual(
+            stats, {"subscribed": 1, "unsubscribed": 2, "locally_unsubscribed": 1}
+        )
+        self.assertEqual(
+            sorted(server.subscribers(1)), ["Synced@ulule.com", "local@ulule.com"]
+        )
+        self.assertEqual(
+            sorted(
+                NewsletterSubscriber.objects.filter(is_unsubscribed=False).values_list(
+                    "email", flat=True
+                )
+            ),
+            ["local@ulule.com", "synced@ulule.com"],
+        )
+        self.assertIsNotNone(
+            NewsletterSubscriber.objects.get(email="bounced@ulule.com").unsubscribed_at
+        )
+        self.assertEqual(
+            [call.params["Offset"] for call in server.calls_to("contact")],
+            ["0", "2", "4"],
+        )
+
+    def test_retries(self):
+        server, backend = self.serve()
+
+        server.fail("contactslist_managemanycontacts", status=429, times=2)
+
+        backend.subscribe(1, "adele@ulule.com")
+
+        self.assertEqual(
+            [
+                call.status
+                for call in server.calls_to("contactslist_managemanycontacts")
+            ],
+            [429, 429, 201],
+        )
+        self.assertEqual(server.subscribers(1), ["adele@ulule.com"])
+        self.assertEqual(len(server.connections), 1)
+
+        server.fail("contact", status=503)
+
+        self.assertEqual(
+            list(backend.iter_list_contacts(1)), [("adele@ulule.com", False)]
+        )
+        self.assertEqual(
+            [call.status for call in server.calls_to("contact")], [503, 200]
+        )
+
+        # A POST may have been handled before the gateway error, it is not
+        # retried
+        server.fail("contactslist_managemanycontacts", status=503)
+
+        with self.assertRaises(Exception):
+            backend.subscribe(1, "bruno@ulule.com")
+
+        self.assertEqual(
+            server.calls_to("contactslist_managemanycontacts")[-1].status, 503
+        )
+        self.assertEqual(len(server.calls_to("contactslist_managemanycontacts")), 4)
+
+    def test_rate_limit(self):
+        server, backend = self.serve(rate_limit=2)
+
+        emails = ["%d@ulule.com" % i for i in range(4)]
+
+        for email in emails:
+            backend.subscribe(1, email)
+
+        statuses = [
+            call.status for call in server.calls_to("contactslist_managemanycontacts")
+        ]
+
+        self.assertEqual(statuses[:3], [201, 201, 429])
+        self.assertEqual(statuses.count(201), 4)
+        self.assertEqual(server.subscribers(1), emails)
+
+    def test_error_rate(self):
+        server, backend = self.serve(error_rate=1, seed=1)
+
+        with self.assertRaises(Exception):
+            backend.subscribe(1, "adele@ulule.com")
+
+        with self.assertRaises(Exception):
+            list(backend.iter_list_contacts(1))
+
+        # 500 is not retried, whatever the method
+        self.assertEqual(
+            [(call.method, call.status) for call in server.calls],
+            [("POST", 500), ("GET", 500)],
+        )
+        self.assertEqual(server.subscribers(1), [])
+
+    def test_latency(self):
+        with mock.patch("courriers.backends.mailjet_rest.MAILJET_TIMEOUT", 0.05):
+            server, backend = self.serve(latency=0.2)
+
+            with self.assertRaises(Exception):
+                backend.subscribe(1, "adele@ulule.com")
+
+        # Calls are recorded once answered, wait for the timed out one
+        time.sleep(0.3)
+
+        # A read timeout on a POST is not retried, the call may have gone
+        # through
+        self.assertEqual(len(server.calls_to("contactslist_managemanycontacts")), 1)
+
+    def test_unsubscribe_unknown_contact(self):
+        server, backend = self.serve()
+
+        server.add_contacts(1, ["adele@ulule.com"])
+
+        backend.unsubscribe_all("unknown@ulule.com", [1])
+
+        self.assertEqual(
+            [call.status for call in server.calls_to("contact_managecontactslists")],
+            [404],
+        )
+        self.assertEqual(server.subscribers(1), ["adele@ulule.com"])
+
+        server.fail("contact_managecontactslists", status=500)
+
+        with self.assertRaises(Exception):
+            backend.unsubscribe_all("adele@ulule.com", [1])
+
+        self.assertEqual(server.subscribers(1), ["adele@ulule.com"])
+
+    def test_contacts_pagination(self):
+        server, backend = self.serve()
+
+        emails = ["%d@ulule.com" % i for i in range(25)]
+
+        server.add_contacts(1, emails)
+
+        backend.unsubscribe_all("3@ulule.com", [1])
+
+        pages = [
+            backend.client.contact.get(
+                filters={"ContactsList": 1, "Limit": 10, "Offset": offset}
+            ).json()
+            for offset in (0, 10, 20)
+        ]
+
+        self.assertEqual([page["Count"] for page in pages], [10, 10, 5])
+        self.assertEqual(
+            [contact["Email"] for page in pages for contact in page["Data"]], emails
+        )
+
+        response = backend.client.listrecipient.get(
+            filters={"ContactsList": 1, "Unsub": True}
+        ).json()
+
+        self.assertEqual(
+            [recipient["ContactEmail"] for recipient in response["Data"]],
+            ["3@ulule.com"],
+        )
+
+    def test_unsubscribe_all(self):
+        from courriers.backends.mailjet_rest import MailjetRESTBackend
+
+        backend = MailjetRESTBackend()
+        backend.client = mock.Mock()
+
+        backend.unsubscribe_all("adele@ulule.com", [1, None, 2])
+
+        backend.client.contact_managecontactslists.create.assert_called_once_with(
+            id="adele@ulule.com",
+            data={
+                "ContactsLists": [
+                    {"ListID": 1, "Action": "unsub"},
+                    {"ListID": 2, "Action": "unsub"},
+                ]
+            },
+        )
+        self.assertFalse(backend.client.contactslist_ManageManyContacts.create.called)
+
+    def test_batched_operations(self):
+        from courriers.backends.mailjet_rest import MailjetRESTBackend
+
+        backend = MailjetRESTBackend()
+        backend.client = mock.Mock()
+
+        with mock.patch(
+            "courriers.backends.mailjet_rest.MAILJET_BATCH_SUBSCRIPTIONS", True
+        ), mock.patch("courriers.backends.mailjet_rest.MAILJET_CONTACTSLIST_LIMIT", 2):
+            backend.subscribe(1, "a@example.com")
+            backend.subscribe(1, "b@example.com")
+            backend.subscribe(1, "c@example.com")
+            backend.unsubscribe(1, "b@example.com")
+            backend.unsubscribe(2, "a@example.com")
+            backend.subscribe(1, "b@example.com")
+
+            manage = backend.client.contactslist_ManageManyContacts.create
+
+            self.assertFalse(manage.called)
+            self.assertEqual(NewsletterListOperation.objects.count(), 6)
+
+            self.assertEqual(backend.flush_operations(), 6)
+
+        self.assertEqual(NewsletterListOperation.objects.count(), 0)
+        self.assertEqual(
+            [(c[1]["id"], c[1]["data"]) for c in manage.call_args_list],
+            [
+                (
+                    1,
+                    {
+                        "Action": "addforce",
+                        "Contacts": [
+                            {"Email": "a@example.com"},
+                            {"Email": "c@example.com"},
+                        ],
+                    },
+                ),
+                (1, {"Action": "addforce", "Contacts": [{"Email": "b@example.com"}]}),
+                (2, {"Action": "unsub", "Contacts": [{"Email": "a@example.com"}]}),
+            ],
+        )
+
+
+@skipIf(httpx is None, "httpx is not installed")
+class AsyncMailjetRESTBackendTests(TestCase):
+    def setUp(self):
+        self.server = MailjetServer().__enter__()
+
+        self.addCleanup(self.server.__exit__)
+
+        for patcher in (
+            mock.patch.multiple(
+                "courriers.backends.mailjet_async",
+                MAILJET_API_KEY="key",
+                MAILJET_API_SECRET_KEY="secret",
+                MAILJET_API_URL=self.server.url,
+                MAILJET_BACKOFF_FACTOR=0,
+                DEFAULT_FROM_NAME="Ulule",
+            ),
+            mock.patch("courriers.backends.mailjet_utils.DEFAULT_FROM_NAME", "Ulule"),
+        ):
+            patcher.start()
+
+            self.addCleanup(patcher.stop)
+
+    def test_send_newsletters_command(self):
+        from django.core.management import CommandError, call_command
+
+        newsletters = []
+
+        for list_id in (1, 2):
+            newsletter_list = NewsletterList.objects.create(
+                name="List %d" % list_id, slug="list-%d" % list_id, list_id=list_id
+            )
+            newsletters.append(
+                Newsletter.objects.create(
+                    name="Newsletter %d" % list_id,
+                    published_at=datetime.now() - datetime.timedelta(hours=1),
+                    status=Newsletter.STATUS_ONLINE,
+                    newsletter_list=newsletter_list,
+                    newsletter_segment=NewsletterSegment.objects.create(
+                        name="segment", segment_id=3, newsletter_list=newsletter_list
+                    ),
+                )
+            )
+
+        with self.assertRaises(CommandError):
+            call_command("send_newsletters_async")
+
+        stdout = StringIO()
+
+        call_command("send_newsletters_async", "--all", "--dry-run", stdout=stdout)
+
+        self.assertEqual(
+            stdout.getvalue(),
+            "Newsletter 1: would be sent\nNewsletter 2: would be sent\n",
+        )
+        self.assertEqual(self.server.calls, [])
+
+        # A gateway error on a send is not retried, Mailjet may have sent it
+        self.server.fail("campaigndraft_send", status=503)
+
+        stdout = StringIO()
+        stderr = StringIO()
+
+        call_command("send_newsletters_async", "--all", stdout=stdout, stderr=stderr)
+
+        self.assertEqual(len(stdout.getvalue().splitlines()), 1)
+        self.assertIn("503", stderr.getvalue())
+
+        self.assertEqual(Newsletter.objects.filter(sent=True).count(), 1)
+        self.assertEqual(len(self.server.calls_to("campaigndraft_send")), 2)
+
+        failed = Newsletter.objects.get(sent=False)
+
+        self.assertEqual(failed.campaign_step, Newsletter.CAMPAIGN_STEP_CONTENT)
+
+        stdout = StringIO()
+
+        call_command("send_newsletters_async", failed.pk, stdout=stdout)
+
+        self.assertEqual(stdout.getvalue(), "%s: sent\n" % failed)
+        self.assertEqual(
+            sorted(c["ContactsListID"] for c in self.server.campaigns.values()),
+            [1, 2],
+        )
+        self.assertEqual(len(self.server.calls_to("campaigndraft_send")), 3)
+
+        with mock.patch("courriers.backends.mailjet_async.FAIL_SILENTLY", True):
+            newsletter = Newsletter.objects.create(
+                name="Newsletter 3",
+                published_at=datetime.now() - datetime.timedelta(hours=1),
+                status=Newsletter.STATUS_ONLINE,
+                newsletter_list=failed.newsletter_list,
+                newsletter_segment=failed.newsletter_segment,
+            )
+
+            self.server.fail("campaigndraft_send", status=400)
+
+            stdout = StringIO()
+            stderr = StringIO()
+
+            call_command(
+                "send_newsletters_async", newsletter.pk, stdout=stdout, stderr=stderr
+            )
+
+            self.assertEqual(stdout.getvalue(), "")
+            self.assertEqual(stderr.getvalue(), "Newsletter 3: not sent\n")
+
+    def test_subscriptions(self):
+        from asgiref.sync import async_to_sync
+
+        from courriers.backends.mailjet_async import AsyncMailjetRESTBackend
+
+        emails = ["%d@ulule.com" % i for i in range(5)]
+
+        async def sync():
+            async with AsyncMailjetRESTBackend() as backend:
+                await backend.sync_lists({1: emails, 2: emails[:1]})
+                await backend.unsubscribe_all("0@ulule.com", [1, 2])
+                await backend.unsubscribe_all("unknown@ulule.com", [1, 2])
+
+        with mock.patch(
+            "courriers.backends.mailjet_async.MAILJET_CONTACTSLIST_LIMIT", 2
+        ):
+            async_to_sync(sync)()
+
+        self.assertEqual(
+            len(self.server.calls_to("contactslist_managemanycontacts")), 4
+        )
+        self.assertEqual(
+            [
+                call.status
+                for call in self.server.calls_to("contact_managecontactslists")
+            ],
+            [201, 404],
+        )
+        self.assertEqual(sorted(self.server.subscribers(1)), emails[1:])
+        self.assertEqual(self.server.subscribers(2), [])
+
+
 class NewsletterModelsTest(TestCase):
     def test_navigation(self):
         monthly = NewsletterList.objects.create(name="TestMonthly", slug="testmonthly")
@@ -548,3 +1906,126 @@ class NewsletterModelsTest(TestCase):
         self.assertEqual(n2.get_previous(), n1)
         self.assertEqual(n2.get_next(), n3)
         self.assertEqual(n1.get_previous(), None)
+
+        neighbours = {
+            newsletter.pk: (newsletter.previous_id, newsletter.next_id)
+            for newsletter in Newsletter.objects.status_online().with_neighbours()
+        }
+
+        self.assertEqual(
+            neighbours,
+            {n1.pk: (None, n2.pk), n2.pk: (n1.pk, n3.pk), n3.pk: (n2.pk, None)},
+        )
+
+        with self.assertNumQueries(1):
+            newsletter = Newsletter.objects.get_with_neighbours(n2.pk)
+
+            self.assertEqual(newsletter, n2)
+            self.assertEqual(newsletter.get_previous(), n1)
+            self.assertEqual(newsletter.get_next(), n3)
+            self.assertEqual(newsletter.get_next().name, "Newsletter3")
+
+        self.assertIsNone(Newsletter.objects.get_with_neighbours(n3.pk).get_next())
+
+        response = self.client.get(n2.get_absolute_url())
+
+        self.assertEqual(response.context["previous_object"], n1)
+        self.assertEqual(response.context["next_object"], n3)
+        self.assertContains(response, n3.get_absolute_url())
+
+    def test_prefetch_content_objects(self):
+        from django.contrib.contenttypes.models import ContentType
+
+        monthly = NewsletterList.objects.create(name="TestMonthly", slug="testmonthly")
+        segment = NewsletterSegment.objects.create(
+            name="monthly fr", segment_id=3, newsletter_list=monthly, lang="fr"
+        )
+        newsletter = Newsletter.objects.create(
+            name="Newsletter1",
+            status=Newsletter.STATUS_ONLINE,
+            published_at=datetime.now() - datetime.timedelta(hours=1),
+            newsletter_list=monthly,
+            newsletter_segment=segment,
+        )
+
+        users = [
+            User.objects.create_user("user%d" % i, "user%d@ulule.com" % i)
+            for i in range(3)
+        ]
+
+        for position, content_object in enumerate(users + [segment, None]):
+            NewsletterItem.objects.create(
+                newsletter=newsletter,
+                content_object=content_object,
+                position=position,
+            )
+
+        ContentType.objects.get_for_models(User, NewsletterSegment)
+
+        with mock.patch.object(
+            settings,
+            "CONTENT_OBJECTS_SELECT_RELATED",
+            {"courriers.newslettersegment": ["newsletter_list"]},
+        ):
+            with self.assertNumQueries(3):
+                items = list(newsletter.items.prefetch_content_objects())
+
+                self.assertEqual(
+                    [item.content_object for item in items], users + [segment, None]
+                )
+                self.assertEqual(items[3].content_object.newsletter_list, monthly)
+
+        # the newsletter, its items and one query per content type
+        with self.assertNumQueries(4):
+            self.client.get(reverse("newsletter_raw_detail", args=[newsletter.pk]))
+
+    def test_query_plans(self):
+        from django.db import connection, transaction
+
+        if connection.vendor not in ("sqlite", "postgresql"):
+            self.skipTest("No query plan assertions for %s" % connection.vendor)
+
+        monthly = NewsletterList.objects.create(name="TestMonthly", slug="testmonthly")
+        segment = NewsletterSegment.objects.create(
+            name="monthly fr", segment_id=3, newsletter_list=monthly, lang="fr"
+        )
+        n1 = Newsletter.objects.create(
+            name="Newsletter1",
+            status=Newsletter.STATUS_ONLINE,
+            published_at=datetime.now() - datetime.timedelta(hours=1),
+            newsletter_list=monthly,
+            newsletter_segment=segment,
+        )
+
+        queries = [
+            (
+                "courriers_newsletter_list_pub",
+                Newsletter.objects.filter(newsletter_list=monthly).status_online(),
+            ),
+            (
+                "courriers_newsletter_list_pub",
+                Newsletter.objects.filter(newsletter_list=monthly)
+                .status_online()
+                .filter(published_at__lt=n1.published_at)
+                .order_by("-published_at"),
+            ),
+            (
+                "courriers_newsletter_list_pub",
+                monthly.newsletters.status_online()
+                .filter(newsletter_segment__lang="fr")
+                .order_by("-published_at"),
+            ),
+            ("courriers_newsletter_stat_pub", Newsletter.objects.status_online()),
+        ]
+
+        with transaction.atomic():
+            if connection.vendor == "postgresql":
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+
+            for index, queryset in queries:
+                plan = queryset.explain()
+
+                self.assertIn(index, plan)
+                self.assertNotIn("TEMP B-TREE", plan)
+                self.assertNotRegex(plan, r"(SCAN|Seq Scan on) courriers_newsletter\b")
@@ -0,0 +1,7 @@
+from django.conf.urls import include, url
+from django.contrib import admin
+
+urlpatterns = [
+    url(r"^admin/", admin.site.urls),
+    url(r"^", include("courriers.urls")),
+]
@@ -0,0 +1,123 @@
+import threading
+import time
+
+from contextlib import contextmanager
+from functools import lru_cache
+
+from django.core.cache import caches
+
+
+class TokenBucket(object):
+    """
+    A token bucket refilled at ``rate`` tokens per second holding at most
+    ``burst`` tokens, shared by every thread of the process.
+    """
+
+    def __init__(self, rate, burst=None, clock=time.monotonic, sleep=time.sleep):
+        self.rate = float(rate)
+        self.burst = burst or max(1, int(rate))
+        self.clock = clock
+        self.sleep = sleep
+
+        self._tokens = float(self.burst)
+        self._updated_at = clock()
+        self._lock = threading.Lock()
+
+    def take(self, available, updated_at, now, tokens):
+        """
+        Refills ``available`` tokens since ``updated_at`` then takes
+        ``tokens``, returns the tokens left and how long the caller has to
+        wait before using them. The bucket may go into debt so concurrent
+        callers queue up instead of spinning.
+        """
+        available = min(self.burst, available + (now - updated_at) * self.rate)
+        available -= tokens
+
+        if available >= 0:
+            return available, 0
+
+        return available, -available / self.rate
+
+    def consume(self, tokens=1):
+        with self._lock:
+            now = self.clock()
+
+            self._tokens, wait = self.take(self._tokens, self._updated_at, now, tokens)
+            self._updated_at = now
+
+            return wait
+
+    def acquire(self, tokens=1):
+        wait = self.consume(tokens)
+
+        if wait > 0:
+            self.sleep(wait)
+
+
+class CacheTokenBucket(TokenBucket):
+    """
+    Coordinates several processes through a shared cache: the tokens left
+    and the time of the last refill are stored in the cache and updated
+    under a lock taken with ``cache.add()``.
+    """
+
+    lock_timeout = 1
+
+    def __init__(
+        self,
+        rate,
+        burst=None,
+        cache=None,
+        key_prefix="courriers:throttle",
+        clock=time.time,
+        sleep=time.sleep,
+    ):
+        super(CacheTokenBucket, self).__init__(
+            rate, burst=burst, clock=clock, sleep=sleep
+        )
+
+        self.cache = cache or caches["default"]
+        self.key = "%s:bucket" % key_prefix
+        self.lock_key = "%s:lock" % key_prefix
+
+    @contextmanager
+    def lock(self):
+        # The lock expires on its own if its owner died while holding it
+        while not self.cache.add(self.lock_key, 1, self.lock_timeout):
+            time.sleep(0.001)
+
+        try:
+            yield
+        finally:
+            self.cache.delete(self.lock_key)
+
+    def consume(self, tokens=1):
+        with self.lock():
+            now = self.clock()
+
+            available, updated_at = self.cache.get(self.key) or (self.burst, now)
+
+            available, wait = self.take(available, updated_at, now, tokens)
+
+            self.cache.set(self.key, (available, now), int(self.burst / self.rate) + 60)
+
+        return wait
+
+
+@lru_cache(maxsize=None)
+def _get_throttle(rate, burst, cache_alias):
+    if not rate:
+        return None
+
+    if cache_alias:
+        return CacheTokenBucket(rate, burst=burst, cache=caches[cache_alias])
+
+    return TokenBucket(rate, burst=burst)
+
+
+def get_throttle():
+    from . import settings
+
+    return _get_throttle(
+        settings.THROTTLE_RATE, settings.THROTTLE_BURST, settings.THROTTLE_CACHE_ALIAS
+    )
@@ -1,6 +1,10 @@
 from django.core import exceptions
 
+from array import array
+from bisect import bisect_left
+from heapq import merge
 from importlib import import_module
+from itertools import islice
 
 
 CLASS_PATH_ERROR = "django-courriers is unable to interpret settings value for %s. " "%s should be in the form of a tupple: " "('path.to.models.Class', 'app_label')."
@@ -86,3 +90,35 @@ def ajaxify_template_name(name):
     else:
         name += "-ajax"
     return name
+
+
+def chunked(iterable, size):
+    """
+    Yields lists of at most ``size`` elements from ``iterable`` without
+    materializing more than one chunk at a time.
+    """
+    iterator = iter(iterable)
+
+    while True:
+        chunk = list(islice(iterator, size))
+
+        if not chunk:
+            return
+
+        yield chunk
+
+
+def sorted_array(iterable, typecode="Q", chunk_size=100000):
+    """
+    Returns the values of ``iterable`` as a sorted ``array``, sorting at most
+    ``chunk_size`` values as Python objects at a time.
+    """
+    chunks = [array(typecode, sorted(chunk)) for chunk in chunked(iterable, chunk_size)]
+
+    return array(typecode, merge(*chunks))
+
+
+def array_contains(values, value):
+    index = bisect_left(values, value)
+
+    return index < len(values) and values[index] == value
@@ -1,13 +1,16 @@
 # -*- coding: utf-8 -*-
 from django.views.generic import ListView, DetailView, FormView, TemplateView
 from django.urls import reverse
-from django.http import HttpResponseRedirect
+from django.core.paginator import InvalidPage
+from django.http import Http404, HttpResponseRedirect
 from django.shortcuts import get_object_or_404
 from django.utils.functional import cached_property
 from django.views.generic.base import TemplateResponseMixin
 from django.utils import translation
 
-from .settings import PAGINATE_BY
+from . import caching
+from .pagination import KeysetPaginator
+from .settings import KEYSET_PAGINATION, PAGINATE_BY
 from .models import Newsletter, NewsletterList
 from .forms import SubscriptionForm, UnsubscribeForm
 from .utils import ajaxify_template_var
@@ -32,15 +35,23 @@ class NewsletterListView(AJAXResponseMixin, ListView):
     context_object_name = "newsletters"
     template_name = "courriers/newsletter_list.html"
     paginate_by = PAGINATE_BY
+    keyset_pagination = KEYSET_PAGINATION
+    cursor_kwarg = "cursor"
 
     def dispatch(self, *args, **kwargs):
         return super(NewsletterListView, self).dispatch(*args, **kwargs)
 
     @cached_property
     def newsletter_list(self):
-        return get_object_or_404(
-            NewsletterList.objects.all(), slug=self.kwargs.get("slug")
-        )
+        slug = self.kwargs.get("slug")
+
+        def get_newsletter_list():
+            return get_object_or_404(NewsletterList.objects.all(), slug=slug)
+
+        if caching.is_enabled():
+            return caching.get_newsletter_list(slug, get_newsletter_list)
+
+        return get_newsletter_list()
 
     def get_queryset(self):
         lang = translation.get_language()
@@ -50,6 +61,60 @@ class NewsletterListView(AJAXResponseMixin, ListView):
         qs = qs.order_by("-published_at")
         return qs
 
+    def get_page_number(self):
+        return (
+            self.kwargs.get(self.page_kwarg)
+            or self.request.GET.get(self.page_kwarg)
+            or 1
+        )
+
+    def paginate_keyset(self, queryset, page_size):
+        paginator = KeysetPaginator(queryset, page_size)
+
+        page_number = self.get_page_number()
+        cursor = self.request.GET.get(self.cursor_kwarg)
+
+        def paginate():
+            try:
+                return paginator.page(page_number, cursor=cursor)
+            except InvalidPage as e:
+                raise Http404("Invalid page (%s): %s" % (cursor or page_number, e))
+
+        if caching.is_enabled():
+            page = caching.get_keyset_page(
+                self.newsletter_list.pk,
+                (translation.get_language(), page_size, cursor or page_number),
+                paginate,
+            )
+        else:
+            page = paginate()
+
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    def paginate_queryset(self, queryset, page_size):
+        if self.keyset_pagination:
+            return self.paginate_keyset(queryset, page_size)
+
+        if not caching.is_enabled():
+            return super(NewsletterListView, self).paginate_queryset(
+                queryset, page_size
+            )
+
+        def paginate():
+            paginator, page, object_list, is_paginated = super(
+                NewsletterListView, self
+            ).paginate_queryset(queryset, page_size)
+
+            return paginator, page
+
+        paginator, page = caching.get_page(
+            self.newsletter_list.pk,
+            (translation.get_language(), page_size, self.get_page_number()),
+            paginate,
+        )
+
+        return (paginator, page, page.object_list, page.has_other_pages())
+
     def get_context_data(self, **kwargs):
         context = super(NewsletterListView, self).get_context_data(**kwargs)
         context["newsletter_list"] = self.newsletter_list
@@ -64,10 +129,48 @@ class NewsletterDetailView(AJAXResponseMixin, DetailView):
     def get_queryset(self):
         return self.model.objects.status_online()
 
+    def get_newsletter(self, queryset=None):
+        if queryset is None:
+            queryset = self.get_queryset()
+
+        try:
+            return queryset.get_with_neighbours(self.kwargs.get(self.pk_url_kwarg))
+        except queryset.model.DoesNotExist:
+            raise Http404("No newsletter found matching the query")
+
+    def get_object(self, queryset=None):
+        if not caching.is_enabled():
+            return self.get_newsletter(queryset)
+
+        pk = self.kwargs.get(self.pk_url_kwarg)
+
+        newsletter_list_id = caching.get_newsletter_list_id(pk)
+
+        if newsletter_list_id is None:
+            return self.get_newsletter(queryset)
+
+        def get_newsletter():
+            newsletter = self.get_newsletter()
+
+            # Fetched before caching the newsletter so it is cached along
+            newsletter.newsletter_list
+
+            return newsletter
+
+        return caching.get_or_set(
+            caching.make_key(
+                "detail", pk, caching.get_list_version(newsletter_list_id)
+            ),
+            get_newsletter,
+            lambda: caching.get_timeout(newsletter_list_id),
+        )
+
     def get_context_data(self, **kwargs):
         context = super(NewsletterDetailView, self).get_context_data(**kwargs)
 
         context["newsletter_list"] = self.object.newsletter_list
+        context["previous_object"] = self.object.get_previous()
+        context["next_object"] = self.object.get_next()
 
         return context
 
@@ -136,7 +239,7 @@ class NewsletterRawDetailView(AJAXResponseMixin, DetailView):
     def get_context_data(self, **kwargs):
         context = super(NewsletterRawDetailView, self).get_context_data(**kwargs)
 
-        context["items"] = self.object.items.all()
+        context["items"] = self.object.items.prefetch_content_objects()
 
         for item in context["items"]:
             item.newsletter = self.object
@@ -23,6 +23,10 @@ setup(
     install_requires=[
         "django-separatedvaluesfield",
     ],
+    extras_require={
+        "mailjet": ["mailjet_rest"],
+        "async": ["httpx"],
+    },
     classifiers=[
         "Environment :: Web Environment",
         "Intended Audience :: Developers",